@@ -0,0 +1,121 @@
+"""CPU cost against bytes saved when compressing list and export responses.
+
+Bodies are the ones the routes send: `Page[SamplePublic]` pages of several
+sizes, and NDJSON and CSV exports streamed in `export.fetch_size` row chunks.
+Every encoding the `CompressionMiddleware` supports is run at a few levels.
+Streamed bodies are compressed chunk by chunk with a flush after each chunk,
+as the middleware does. br and zstd are skipped unless the `compression`
+extra is installed.
+
+    uv run python -m benchmarks.compression_benchmark
+"""
+
+import timeit
+from collections import namedtuple
+from collections.abc import Callable
+from datetime import datetime
+from functools import partial
+from itertools import batched
+from uuid import uuid4
+
+from src.dependencies import config
+from src.middlewares.compression_middleware import (
+    BrotliEncoder,
+    Encoder,
+    GzipEncoder,
+    ZstdEncoder,
+)
+from src.models import Sample, SamplePublic
+from src.schemas import ExportFormat, FastJSONResponse, Page
+from src.services.sample_service import SampleService
+
+PAGE_SIZES = (10, 100, 500)
+EXPORT_ROWS = 10_000
+NUMBER = 20
+
+Row = namedtuple("Row", ["id", "name"])
+
+
+def page_body(size: int) -> list[bytes]:
+    now = datetime.now()
+    items = [
+        Sample(id=uuid4(), name=f"sample-{i}", created_at=now, updated_at=now)
+        for i in range(size)
+    ]
+    page = Page[Sample](items=items, total=size, page=1, size=size, pages=1)
+    return [FastJSONResponse.validated(Page[SamplePublic], page).body]
+
+
+def export_body(format: ExportFormat) -> list[bytes]:
+    rows = [Row(uuid4(), f"sample-{i}") for i in range(EXPORT_ROWS)]
+    chunks = [b"id,name\r\n"] if format == ExportFormat.CSV else []
+    fetch_size = config.get_config().export.fetch_size
+    chunks.extend(
+        SampleService._encode(batch, format)
+        for batch in batched(rows, fetch_size)
+    )
+    return chunks
+
+
+def codecs() -> dict[str, Callable[[], Encoder]]:
+    available: dict[str, Callable[[], Encoder]] = {}
+    for level in (1, 6, 9):
+        available[f"gzip-{level}"] = partial(GzipEncoder, level)
+    try:
+        import brotli
+
+        for quality in (1, 4, 6):
+            available[f"br-{quality}"] = partial(BrotliEncoder, brotli, quality)
+    except ImportError:
+        print("brotli not installed, skipping br")
+    try:
+        import zstandard
+
+        for level in (1, 3, 9):
+            available[f"zstd-{level}"] = partial(ZstdEncoder, zstandard, level)
+    except ImportError:
+        print("zstandard not installed, skipping zstd")
+    return available
+
+
+def compress(encoder: Encoder, chunks: list[bytes]) -> int:
+    size = 0
+    for chunk in chunks[:-1]:
+        size += len(encoder.compress(chunk)) + len(encoder.flush())
+    size += len(encoder.compress(chunks[-1])) + len(encoder.finish())
+    return size
+
+
+def compress_with(factory: Callable[[], Encoder], chunks: list[bytes]) -> int:
+    return compress(factory(), chunks)
+
+
+def main():
+    bodies = {f"page[size={size}]": page_body(size) for size in PAGE_SIZES}
+    bodies["export[ndjson]"] = export_body(ExportFormat.NDJSON)
+    bodies["export[csv]"] = export_body(ExportFormat.CSV)
+
+    print(
+        f"{'body':<16} {'codec':<8} {'bytes':>10} {'encoded':>10} "
+        f"{'ratio':>6} {'ms':>8} {'KB saved/ms':>12}"
+    )
+    for name, chunks in bodies.items():
+        original = sum(len(chunk) for chunk in chunks)
+        for codec, factory in codecs().items():
+            encoded = compress(factory(), chunks)
+            seconds = (
+                timeit.timeit(
+                    partial(compress_with, factory, chunks), number=NUMBER
+                )
+                / NUMBER
+            )
+            saved = (original - encoded) / 1024 / (seconds * 1e3)
+            print(
+                f"{name:<16} {codec:<8} {original:>10} {encoded:>10} "
+                f"{original / encoded:>6.1f} {seconds * 1e3:>8.3f} "
+                f"{saved:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
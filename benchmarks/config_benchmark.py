@@ -0,0 +1,28 @@
+"""Per-request cost of resolving `Config`.
+
+Compares re-parsing every settings source (the old `get_config()`) with the
+cached snapshot returned today.
+
+    uv run python -m benchmarks.config_benchmark
+"""
+
+import timeit
+
+from src.dependencies import config
+
+NUMBER = 1_000
+
+
+def main():
+    config.get_config()
+
+    parse = timeit.timeit(config.BaseConfig, number=NUMBER) / NUMBER
+    cached = timeit.timeit(config.get_config, number=NUMBER) / NUMBER
+
+    print(f"re-parse per call: {parse * 1e6:10.2f} us")
+    print(f"cached per call:   {cached * 1e6:10.2f} us")
+    print(f"speedup:           {parse / cached:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Per-request overhead of the outbound HTTP client against a stub server.
+
+Serves a one-route Starlette app on a free local port and prints the time per
+request through `ResilientTransport` next to a plain `httpx.AsyncClient`.
+Retries, circuit breaking and host isolation are covered by
+`tests/test_http_client.py`.
+
+    uv run python -m benchmarks.http_client_benchmark
+"""
+
+import asyncio
+import socket
+import time
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.dependencies import config, http_client
+
+ITERATIONS = 1_000
+
+
+async def ok(request: Request):
+    return PlainTextResponse("ok")
+
+
+stub = Starlette(routes=[Route("/ok", ok)])
+
+
+class StubServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config) -> None:
+        super().__init__(config)
+        self.ready = asyncio.Event()
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        self.ready.set()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def measure(http: httpx.AsyncClient, url: str) -> float:
+    await http.get(f"{url}/ok")
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await http.get(f"{url}/ok")
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+async def main():
+    port = free_port()
+    server = StubServer(
+        uvicorn.Config(
+            stub, port=port, log_level="warning", lifespan="off", ws="none"
+        )
+    )
+    serving = asyncio.create_task(server.serve())
+    await server.ready.wait()
+
+    url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient() as plain:
+            baseline = await measure(plain, url)
+        transport = http_client.ResilientTransport(config.HttpClient())
+        async with httpx.AsyncClient(transport=transport) as resilient:
+            observed = await measure(resilient, url)
+    finally:
+        server.should_exit = True
+        await serving
+
+    print(f"plain client:        {baseline * 1e6:8.1f} us per request")
+    print(f"resilient transport: {observed * 1e6:8.1f} us per request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
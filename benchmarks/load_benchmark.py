@@ -0,0 +1,409 @@
+"""Load test of the sample CRUD API.
+
+Starts the app on a free port (or targets `--url`), seeds `--samples` rows
+through `POST /samples/bulk`, then drives each endpoint of `sample_router.py`
+with `--requests` requests at a fixed `--concurrency`. Throughput and p50, p95
+and p99 latency per scenario are written as JSON. When `--baseline` exists,
+the run is compared against it and exits non-zero if any scenario had errors,
+a higher error rate, or lost more than `--threshold` percent of throughput or
+gained as much p95 latency. The started app runs with admission control off
+unless `--admission` is passed; the setting is recorded with the results.
+
+    docker-compose up -d
+    uv run python -m benchmarks.load_benchmark --samples 10000
+    uv run python -m benchmarks.load_benchmark --save-baseline
+
+The started app upgrades the schema itself, so generate the initial migration
+first (see docs/database.md). Results go to `benchmarks/results/`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+
+RESULTS = Path(__file__).parent / "results"
+BASELINE = Path(__file__).parent / "baselines" / "load.json"
+
+SEED_CHUNK = 500
+PAGE_SIZES = (10, 100, 500)
+BULK_SIZE = 100
+STARTUP_TIMEOUT = 60.0
+
+# the started app must not talk to GCP or log every request; admission
+# control is set by --admission so shed requests are not measured by accident
+APP_ENV = {
+    "OBSERVABILITY__EXPORTER": "none",
+    "LOGGING__LEVEL": "warning",
+    "DATABASE__MIGRATIONS": "upgrade",
+}
+
+
+@dataclass
+class State:
+    """Rows a scenario may touch, shared by the workers of a scenario."""
+
+    ids: list[str] = field(default_factory=list)
+    disposable: list[str] = field(default_factory=list)
+    deep_cursor: str | None = None
+    counter: int = 0
+
+    def name(self) -> str:
+        self.counter += 1
+        return f"load-{self.counter}"
+
+
+Request = Callable[[httpx.AsyncClient, State], Awaitable[httpx.Response]]
+
+
+@dataclass
+class Result:
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def scenarios(samples: int) -> dict[str, Request]:
+    """Every measured request, keyed by the name used in the report."""
+
+    async def create(client, state):
+        return await client.post("/samples/", json={"name": state.name()})
+
+    async def create_bulk(client, state):
+        return await client.post(
+            "/samples/bulk",
+            json=[{"name": state.name()} for _ in range(BULK_SIZE)],
+        )
+
+    async def read(client, state):
+        return await client.get(f"/samples/{random.choice(state.ids)}")
+
+    async def update(client, state):
+        return await client.patch(
+            f"/samples/{random.choice(state.ids)}",
+            json={"name": state.name()},
+        )
+
+    async def delete(client, state):
+        return await client.delete(f"/samples/{state.disposable.pop()}")
+
+    def read_all(size: int, page: int) -> Request:
+        async def request(client, state):
+            return await client.get(
+                "/samples/", params={"size": size, "page": page}
+            )
+
+        return request
+
+    def read_all_cursor(deep: bool) -> Request:
+        async def request(client, state):
+            params = {"size": 100}
+            if deep and state.deep_cursor:
+                params["cursor"] = state.deep_cursor
+            return await client.get("/samples/cursor", params=params)
+
+        return request
+
+    named: dict[str, Request] = {
+        "create": create,
+        f"create_bulk[{BULK_SIZE}]": create_bulk,
+        "read": read,
+    }
+    for size in PAGE_SIZES:
+        last = max(samples // size, 1)
+        named[f"read_all[size={size},page=1]"] = read_all(size, 1)
+        named[f"read_all[size={size},page={last}]"] = read_all(size, last)
+    named["read_all_cursor[first]"] = read_all_cursor(deep=False)
+    named["read_all_cursor[deep]"] = read_all_cursor(deep=True)
+    named["update"] = update
+    named["delete"] = delete
+    return named
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+async def run(
+    client: httpx.AsyncClient,
+    state: State,
+    request: Request,
+    requests: int,
+    concurrency: int,
+) -> Result:
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await request(client, state)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return Result(
+        requests=requests,
+        errors=errors,
+        seconds=round(seconds, 3),
+        throughput=round(requests / seconds, 1),
+        p50_ms=round(percentile(latencies, 50) * 1000, 2),
+        p95_ms=round(percentile(latencies, 95) * 1000, 2),
+        p99_ms=round(percentile(latencies, 99) * 1000, 2),
+    )
+
+
+async def seed(
+    client: httpx.AsyncClient, state: State, count: int
+) -> list[str]:
+    ids = []
+    for offset in range(0, count, SEED_CHUNK):
+        size = min(SEED_CHUNK, count - offset)
+        response = await client.post(
+            "/samples/bulk",
+            json=[{"name": state.name()} for _ in range(size)],
+        )
+        response.raise_for_status()
+        ids.extend(
+            item["id"]
+            for item in response.json()["data"]["items"]
+            if item["status"] == "created"
+        )
+    return ids
+
+
+async def find_deep_cursor(
+    client: httpx.AsyncClient, samples: int
+) -> str | None:
+    """Cursor about 90% of the way through the table."""
+    cursor = None
+    for _ in range(samples * 9 // 10 // 500):
+        params = {"size": 500} | ({"cursor": cursor} if cursor else {})
+        response = await client.get("/samples/cursor", params=params)
+        response.raise_for_status()
+        cursor = response.json()["next_cursor"] or cursor
+    return cursor
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(url: str) -> None:
+    async with httpx.AsyncClient(base_url=url) as client:
+        while True:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+
+
+def app_env(admission: bool) -> dict[str, str]:
+    env = APP_ENV | {"ADMISSION__ENABLED": str(admission).lower()}
+    return env | os.environ
+
+
+def start_app(port: int, env: dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+
+
+def compare(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    threshold: float,
+) -> list[str]:
+    """Scenarios that failed requests or were slower than the baseline.
+
+    Any error fails a scenario, since a shed or failed request is also a
+    fast one; slower means by more than `threshold` percent.
+    """
+    regressions = []
+    for name, current in results.items():
+        error_rate = current["errors"] / current["requests"] * 100
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<36} no baseline  errors {error_rate:6.2f}%")
+            if current["errors"]:
+                regressions.append(name)
+            continue
+        throughput = (
+            (previous["throughput"] - current["throughput"])
+            / previous["throughput"]
+            * 100
+        )
+        p95 = (
+            (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+        )
+        previous_rate = previous["errors"] / previous["requests"] * 100
+        print(
+            f"{name:<36} throughput {-throughput:+7.1f}%  p95 {p95:+7.1f}%  "
+            f"errors {error_rate:6.2f}% (was {previous_rate:.2f}%)"
+        )
+        if (
+            throughput > threshold
+            or p95 > threshold
+            or current["errors"]
+            or error_rate > previous_rate
+        ):
+            regressions.append(name)
+    return regressions
+
+
+def _describe(admission: bool | None) -> str:
+    if admission is None:
+        return "unknown (--url)"
+    return "on" if admission else "off"
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="target a running app instead")
+    parser.add_argument("--samples", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--only", nargs="*", help="scenario name prefixes")
+    parser.add_argument(
+        "--admission",
+        action="store_true",
+        help="run the started app with admission control on",
+    )
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    # unknown for an app started elsewhere
+    admission = None
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        env = app_env(args.admission)
+        admission = env["ADMISSION__ENABLED"] == "true"
+        process = start_app(port, env)
+    print(f"admission control: {_describe(admission)}")
+
+    try:
+        try:
+            async with asyncio.timeout(STARTUP_TIMEOUT):
+                await wait_until_up(url)
+        except TimeoutError:
+            raise TimeoutError(f"app did not become healthy at {url}") from None
+        limits = httpx.Limits(
+            max_connections=args.concurrency,
+            max_keepalive_connections=args.concurrency,
+        )
+        async with httpx.AsyncClient(
+            base_url=url, limits=limits, timeout=30.0
+        ) as client:
+            state = State()
+            state.ids = await seed(client, state, args.samples)
+            state.disposable = await seed(
+                client, state, args.requests + args.warmup
+            )
+            state.deep_cursor = await find_deep_cursor(client, args.samples)
+
+            results = {}
+            for name, request in scenarios(args.samples).items():
+                if args.only and not name.startswith(tuple(args.only)):
+                    continue
+                if args.warmup:
+                    await run(
+                        client, state, request, args.warmup, args.concurrency
+                    )
+                result = await run(
+                    client, state, request, args.requests, args.concurrency
+                )
+                results[name] = asdict(result)
+                print(
+                    f"{name:<36} {result.throughput:9.1f} req/s  "
+                    f"p50 {result.p50_ms:7.2f}  p95 {result.p95_ms:7.2f}  "
+                    f"p99 {result.p99_ms:7.2f} ms  errors {result.errors}"
+                )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "samples": args.samples,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "admission": admission,
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS / f"load-{int(time.time())}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"results written to {output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("regressed:", ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
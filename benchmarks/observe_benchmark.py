@@ -0,0 +1,104 @@
+"""Per-call overhead of `@observe` at 0%, 1% and 100% sampling.
+
+Each iteration runs a router -> service -> repository chain of three decorated
+coroutines, like a request does, and is compared against the same chain
+without decorators. Finished spans go to an exporter that drops them, so only
+the instrumentation cost is measured.
+
+    uv run python -m benchmarks.observe_benchmark
+"""
+
+import asyncio
+import time
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import (
+    ParentBased,
+    Sampler,
+    TraceIdRatioBased,
+)
+
+from src.dependencies import tracer
+
+ITERATIONS = 100_000
+RATES = (0.0, 0.01, 1.0)
+
+
+class DropExporter(SpanExporter):
+    def export(self, spans):
+        return SpanExportResult.SUCCESS
+
+
+class SwitchableSampler(Sampler):
+    def __init__(self) -> None:
+        self.delegate: Sampler = ParentBased(TraceIdRatioBased(1.0))
+
+    def should_sample(self, *args, **kwargs):
+        return self.delegate.should_sample(*args, **kwargs)
+
+    def get_description(self) -> str:
+        return self.delegate.get_description()
+
+
+async def repository():
+    return None
+
+
+async def service():
+    return await repository()
+
+
+async def router():
+    return await service()
+
+
+@tracer.observe()
+async def observed_repository():
+    return None
+
+
+@tracer.observe()
+async def observed_service():
+    return await observed_repository()
+
+
+@tracer.observe()
+async def observed_router():
+    return await observed_service()
+
+
+async def measure(func) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await func()
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+async def main():
+    sampler = SwitchableSampler()
+    provider = TracerProvider(sampler=sampler)
+    provider.add_span_processor(SimpleSpanProcessor(DropExporter()))
+    trace.set_tracer_provider(provider)
+
+    baseline = await measure(router)
+    print(f"undecorated chain:  {baseline * 1e6:8.2f} us")
+    for rate in RATES:
+        sampler.delegate = ParentBased(TraceIdRatioBased(rate))
+        # what tracer.init() derives from observability.sample_rate
+        tracer._disabled = rate == 0
+        observed = await measure(observed_router)
+        overhead = (observed - baseline) / 3
+        print(
+            f"sampling {rate:>6.0%}:    {observed * 1e6:8.2f} us per chain, "
+            f"{overhead * 1e6:6.2f} us per @observe"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,3 +1,10 @@
-from .main import app, server
+import time
 
-__all__ = ["app", "server"]
+_started = time.perf_counter()
+
+from .dependencies import startup  # noqa: E402
+from .main import app, migrate, server  # noqa: E402
+
+startup.record("imports", time.perf_counter() - _started)
+
+__all__ = ["app", "migrate", "server"]
@@ -1,18 +1,43 @@
+from . import (
+    cache as cache,
+)
+from . import (
+    conditional as conditional,
+)
 from . import (
     config as config,
 )
 from . import (
     database as database,
 )
+from . import (
+    group_commit as group_commit,
+)
+from . import (
+    health as health,
+)
 from . import (
     http_client as http_client,
 )
 from . import (
     logger as logger,
 )
+from . import (
+    metrics as metrics,
+)
+from . import (
+    singleflight as singleflight,
+)
+from . import (
+    startup as startup,
+)
 from . import (
     tracer as tracer,
 )
+from .cache import Cache as Cache
+from .conditional import Conditional as Conditional
+from .conditional import make_etag as make_etag
+from .conditional import to_utc as to_utc
 from .config import (
     Config as Config,
 )
@@ -23,13 +48,18 @@ from .config import (
     get_config as get_config,
 )
 from .database import Database as Database
+from .group_commit import GroupCommit as GroupCommit
 from .http_client import HttpClient as HttpClient
+from .logger import (
+    Lazy as Lazy,
+)
 from .logger import (
     Logger as Logger,
 )
 from .logger import (
     get_logger as get_logger,
 )
+from .singleflight import SingleFlight as SingleFlight
 from .tracer import (
     observe as observe,
 )
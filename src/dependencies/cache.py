@@ -0,0 +1,244 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Annotated
+
+from fastapi import Depends
+
+from .config import CacheBackendKind, Config, get_config
+from .logger import Logger, get_logger
+
+config: Config = get_config()
+logger: Logger = get_logger()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    stale_writes: int = 0
+    errors: int = 0
+
+
+class CacheBackend(ABC):
+    """Versioned key/value cache.
+
+    Every entry carries a version (the row's `updated_at` timestamp). A write
+    never replaces an entry holding a newer version, and `invalidate` leaves a
+    tombstone at the writer's version, so a reader that fetched a row before a
+    concurrent update cannot put the old row back.
+    """
+
+    stats: CacheStats
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, version: float) -> bool: ...
+
+    @abstractmethod
+    async def invalidate(self, key: str, version: float) -> None: ...
+
+    async def ping(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+class NullCache(CacheBackend):
+    async def get(self, key: str) -> bytes | None:
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: bytes, version: float) -> bool:
+        return False
+
+    async def invalidate(self, key: str, version: float) -> None:
+        return None
+
+
+@dataclass
+class _Entry:
+    value: bytes | None
+    version: float
+    expires_at: float = 0.0
+
+
+class MemoryCache(CacheBackend):
+    """In-process TTL + LRU cache."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        super().__init__()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def _live(self, key: str) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def _put(self, key: str, entry: _Entry) -> None:
+        entry.expires_at = time.monotonic() + self.ttl
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._live(key)
+        if entry is None or entry.value is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.value
+
+    async def set(self, key: str, value: bytes, version: float) -> bool:
+        entry = self._live(key)
+        if entry is not None and entry.version > version:
+            self.stats.stale_writes += 1
+            return False
+        self._put(key, _Entry(value=value, version=version))
+        return True
+
+    async def invalidate(self, key: str, version: float) -> None:
+        entry = self._live(key)
+        if entry is not None:
+            version = max(version, entry.version)
+        self._put(key, _Entry(value=None, version=version))
+
+
+_SET_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'v')
+if current and tonumber(current) > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'v', ARGV[1], 'd', ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+_INVALIDATE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'v')
+local version = ARGV[1]
+if current and tonumber(current) > tonumber(version) then
+    version = current
+end
+redis.call('HSET', KEYS[1], 'v', version, 'd', '')
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class RedisCache(CacheBackend):
+    """Cache backed by any server speaking the Redis protocol.
+
+    Takes a `redis.asyncio.Redis`-compatible client, so a fake such as
+    `fakeredis.aioredis.FakeRedis` can stand in for a real server.
+    """
+
+    def __init__(self, client, ttl: float, prefix: str = "") -> None:
+        super().__init__()
+        self.client = client
+        self.ttl_ms = int(ttl * 1000)
+        self.prefix = prefix
+        self._set = client.register_script(_SET_SCRIPT)
+        self._invalidate = client.register_script(_INVALIDATE_SCRIPT)
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            value = await self.client.hget(self.prefix + key, "d")
+        except Exception as error:
+            self.stats.errors += 1
+            logger.warning({"message": "Cache get failed", "error": str(error)})
+            return None
+        if not value:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, version: float) -> bool:
+        try:
+            stored = await self._set(
+                keys=[self.prefix + key], args=[version, value, self.ttl_ms]
+            )
+        except Exception as error:
+            self.stats.errors += 1
+            logger.warning({"message": "Cache set failed", "error": str(error)})
+            return False
+        if not stored:
+            self.stats.stale_writes += 1
+        return bool(stored)
+
+    async def invalidate(self, key: str, version: float) -> None:
+        try:
+            await self._invalidate(
+                keys=[self.prefix + key], args=[version, self.ttl_ms]
+            )
+        except Exception as error:
+            self.stats.errors += 1
+            logger.warning(
+                {"message": "Cache invalidate failed", "error": str(error)}
+            )
+
+    async def ping(self) -> None:
+        await self.client.ping()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+_cache: CacheBackend | None = None
+
+
+def _create() -> CacheBackend:
+    match config.cache.backend:
+        case CacheBackendKind.MEMORY:
+            return MemoryCache(
+                ttl=config.cache.ttl, max_entries=config.cache.max_entries
+            )
+        case CacheBackendKind.REDIS:
+            from redis.asyncio import Redis
+
+            return RedisCache(
+                Redis.from_url(config.cache.url),
+                ttl=config.cache.ttl,
+                prefix=f"{config.service}:",
+            )
+        case _:
+            return NullCache()
+
+
+async def init():
+    global _cache
+    if _cache is None:
+        _cache = _create()
+
+
+async def close():
+    global _cache
+    if _cache:
+        await _cache.close()
+        _cache = None
+
+
+async def aget_cache() -> CacheBackend:
+    global _cache
+    if _cache is None:
+        await init()
+    return _cache
+
+
+Cache = Annotated[CacheBackend, Depends(aget_cache)]
@@ -0,0 +1,117 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Annotated
+
+from fastapi import Depends, Request, Response, status
+
+
+def make_etag(*parts: object) -> str:
+    """Weak validator over the given parts, e.g. `(id, updated_at)` pairs."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def to_utc(value: datetime) -> datetime:
+    """`value` in UTC; naive timestamps are read as local time.
+
+    Naive columns such as `Sample.updated_at` are written with
+    `datetime.now()`, so local time is what they hold.
+    """
+    return value.astimezone(UTC)
+
+
+def _utc(value: datetime) -> datetime:
+    # HTTP dates have whole-second precision
+    return to_utc(value).replace(microsecond=0)
+
+
+@dataclass
+class ConditionalRequest:
+    """`If-None-Match` / `If-Modified-Since` validators of a GET request."""
+
+    if_none_match: list[str] | None = None
+    if_modified_since: datetime | None = None
+
+    @property
+    def present(self) -> bool:
+        return (
+            self.if_none_match is not None or self.if_modified_since is not None
+        )
+
+    def is_not_modified(
+        self,
+        etag: str,
+        last_modified: datetime | None = None,
+    ) -> bool:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        if self.if_none_match is not None:
+            opaque = etag.removeprefix("W/")
+            return any(
+                tag == "*" or tag.removeprefix("W/") == opaque
+                for tag in self.if_none_match
+            )
+        if self.if_modified_since is not None and last_modified is not None:
+            return _utc(last_modified) <= self.if_modified_since
+        return False
+
+    @staticmethod
+    def headers(
+        etag: str,
+        last_modified: datetime | None = None,
+    ) -> dict[str, str]:
+        headers = {"ETag": etag}
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                _utc(last_modified), usegmt=True
+            )
+        return headers
+
+    def apply(
+        self,
+        response: Response,
+        etag: str,
+        last_modified: datetime | None = None,
+    ) -> None:
+        response.headers.update(self.headers(etag, last_modified))
+
+    def not_modified(
+        self,
+        etag: str,
+        last_modified: datetime | None = None,
+    ) -> Response:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=self.headers(etag, last_modified),
+        )
+
+
+async def aget_conditional(request: Request) -> ConditionalRequest:
+    conditional = ConditionalRequest()
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        conditional.if_none_match = [
+            tag.strip() for tag in if_none_match.split(",") if tag.strip()
+        ]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            value = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            # an invalid date is ignored, as required by RFC 9110
+            value = None
+        if value is not None:
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=UTC)
+            conditional.if_modified_since = _utc(value)
+
+    return conditional
+
+
+Conditional = Annotated[ConditionalRequest, Depends(aget_conditional)]
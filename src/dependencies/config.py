@@ -1,9 +1,15 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections.abc import Callable
 from enum import StrEnum, auto
 from os import environ
-from typing import Annotated
+from pathlib import Path
+from typing import Annotated, Any
 
 from fastapi import Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from pydantic_settings import (
     BaseSettings,
     JsonConfigSettingsSource,
@@ -57,8 +63,47 @@ class LoggingLevel(StrEnum):
     ERROR = auto()
 
 
+class LogOverflow(StrEnum):
+    DROP_NEWEST = auto()
+    DROP_OLDEST = auto()
+    BLOCK = auto()
+
+
+class Loop(StrEnum):
+    AUTO = auto()
+    ASYNCIO = auto()
+    UVLOOP = auto()
+
+
+class Http(StrEnum):
+    AUTO = auto()
+    H11 = auto()
+    HTTPTOOLS = auto()
+
+
+class Server(BaseModel):
+    workers: int = Field(1, ge=0)  # 0: one per CPU
+    loop: Loop = Loop.AUTO
+    http: Http = Http.AUTO
+    backlog: int = 2048
+    limit_concurrency: int | None = None
+    limit_max_requests: int | None = None
+    timeout_keep_alive: int = 5
+    timeout_graceful_shutdown: int | None = None
+    h11_max_incomplete_event_size: int | None = None
+    reload: bool | None = None  # None: only in the local environment
+
+
 class Logging(BaseModel):
     level: LoggingLevel = LoggingLevel.INFO
+    queue_size: int = 10_000
+    overflow: LogOverflow = LogOverflow.DROP_NEWEST
+
+
+class Migrations(StrEnum):
+    UPGRADE = auto()
+    CHECK = auto()
+    SKIP = auto()
 
 
 class Database(BaseModel):
@@ -70,6 +115,169 @@ class Database(BaseModel):
     host: str = "localhost"
     port: int = 5432
     name: str = "database"
+    pool_size: int = 20
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    pool_use_lifo: bool = False
+    connect_args: dict[str, Any] = {}
+    # psycopg prepares a statement server-side once a connection has run it
+    # this many times; None never prepares
+    prepare_threshold: int | None = 5
+    # compiled statements kept per engine by SQLAlchemy
+    query_cache_size: int = 500
+    # behind PgBouncer in transaction pooling mode, where consecutive
+    # transactions may use different server connections: never prepare
+    pgbouncer: bool = False
+    migrations: Migrations = Migrations.CHECK
+    alembic_config: str = "db/alembic.ini"
+    # read replica URLs; read-only repository methods are balanced across them
+    replicas: list[str] = []
+    replica_max_lag: float = 5.0
+    replica_check_interval: float = 5.0
+
+
+class CacheBackendKind(StrEnum):
+    NONE = auto()
+    MEMORY = auto()
+    REDIS = auto()
+
+
+class Exporter(StrEnum):
+    GCP = auto()
+    OTLP = auto()
+    CONSOLE = auto()
+    MEMORY = auto()
+    NONE = auto()
+
+
+class Observability(BaseModel):
+    exporter: Exporter = Exporter.GCP
+    otlp_endpoint: str | None = None
+    sample_rate: float = Field(1.0, ge=0.0, le=1.0)
+    max_queue_size: int = 2048
+    max_export_batch_size: int = 512
+    schedule_delay_millis: int = 5000
+    export_timeout_millis: int = 30000
+
+
+class Metrics(BaseModel):
+    enabled: bool = True
+    # how often event loop lag and pool gauges are sampled, in seconds
+    interval: float = 1.0
+
+
+class HttpClient(BaseModel):
+    # limits apply per upstream host, so one slow host cannot starve the rest
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 5.0
+    retries: int = 2
+    retry_backoff: float = 0.1
+    retry_backoff_max: float = 2.0
+    retry_statuses: list[int] = [502, 503, 504]
+    retry_methods: list[str] = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+    breaker_failures: int = 5
+    breaker_reset: float = 30.0
+
+
+class Health(BaseModel):
+    # readiness probes run in the background, /readyz serves the last result
+    interval: float = 10.0
+    timeout: float = 2.0
+    # optional upstream the HTTP client must reach for the service to be ready
+    http_url: str | None = None
+
+
+class Api(BaseModel):
+    fast_response: bool = False
+    # concurrent identical reads share one database query
+    single_flight: bool = True
+
+
+class RouteClass(BaseModel):
+    # concurrent requests admitted at first; the limit then adapts between
+    # min_limit and max_limit
+    initial_limit: int = Field(10, ge=1)
+    min_limit: int = Field(1, ge=1)
+    max_limit: int = Field(30, ge=1)
+    # while the class is saturated, a smoothed latency above this many times
+    # its no-load latency shrinks the limit and a lower one grows it
+    tolerance: float = Field(1.5, gt=1.0)
+    # share of the limit kept on each decrease
+    backoff: float = Field(0.9, gt=0.0, lt=1.0)
+    # requests whose estimated queue wait exceeds this get a 503, seconds
+    max_wait: float = 0.5
+
+
+class Admission(BaseModel):
+    enabled: bool = False
+    # GET and HEAD requests
+    read: RouteClass = RouteClass(initial_limit=20)
+    write: RouteClass = RouteClass(max_wait=1.0)
+    # never limited: probes and scrapes must work under overload, and a
+    # streamed export holds its slot for as long as the download lasts
+    exempt: list[str] = [
+        "/livez",
+        "/readyz",
+        "/health",
+        "/metrics",
+        "/samples/export",
+    ]
+
+
+class Encoding(StrEnum):
+    GZIP = auto()
+    BR = auto()
+    ZSTD = auto()
+
+
+class Compression(BaseModel):
+    enabled: bool = True
+    # bodies smaller than this many bytes are sent uncompressed
+    minimum_size: int = 1024
+    # server preference when the client accepts several equally; br and zstd
+    # need the `compression` extra and are skipped without it
+    encodings: list[Encoding] = [Encoding.ZSTD, Encoding.BR, Encoding.GZIP]
+    gzip_level: int = Field(6, ge=1, le=9)
+    brotli_quality: int = Field(4, ge=0, le=11)
+    zstd_level: int = Field(3, ge=1, le=22)
+
+
+class Cache(BaseModel):
+    backend: CacheBackendKind = CacheBackendKind.NONE
+    ttl: float = 60.0
+    max_entries: int = 10_000
+    url: str = "redis://localhost:6379/0"
+
+
+class Bulk(BaseModel):
+    max_items: int = 1000
+    chunk_size: int = 500
+
+
+class GroupCommit(BaseModel):
+    # concurrent creates are merged into one INSERT and one commit
+    enabled: bool = False
+    # seconds a batch stays open after its first row
+    window: float = 0.002
+    # a batch is flushed early once it holds this many rows
+    max_rows: int = Field(100, ge=1)
+
+
+class Export(BaseModel):
+    fetch_size: int = 1000
+
+
+class Watch(BaseModel):
+    enabled: bool = False
+    interval: float = 5.0
 
 
 class BaseConfig(Settings):
@@ -77,16 +285,119 @@ class BaseConfig(Settings):
     host: str = "0.0.0.0"
     port: int = 8080
     environment: Environment = Environment.LOCAL
+    server: Server = Server()
     logging: Logging = Logging()
+    observability: Observability = Observability()
+    metrics: Metrics = Metrics()
+    health: Health = Health()
+    http_client: HttpClient = HttpClient()
+    api: Api = Api()
+    compression: Compression = Compression()
+    admission: Admission = Admission()
     database: Database = Database()
+    cache: Cache = Cache()
+    bulk: Bulk = Bulk()
+    group_commit: GroupCommit = GroupCommit()
+    export: Export = Export()
+    watch: Watch = Watch()
 
 
-async def aget_config() -> BaseConfig:
-    return BaseConfig()
+Listener = Callable[[BaseConfig, BaseConfig], None]
+
+_config: BaseConfig | None = None
+_published: BaseConfig | None = None
+_lock = threading.Lock()
+_listeners: list[Listener] = []
+_watcher: asyncio.Task | None = None
 
 
 def get_config() -> BaseConfig:
-    return BaseConfig()
+    config = _config
+    if config is None:
+        with _lock:
+            if _config is None:
+                _swap(BaseConfig())
+            config = _config
+    return config
+
+
+async def aget_config() -> BaseConfig:
+    return get_config()
+
+
+def invalidate() -> None:
+    """Drop the cached snapshot so the next lookup re-reads every source."""
+    global _config
+    with _lock:
+        _config = None
+
+
+def reload() -> BaseConfig:
+    """Re-read every source and atomically publish the new snapshot."""
+    config = BaseConfig()
+    with _lock:
+        _swap(config)
+    return config
+
+
+def subscribe(listener: Listener) -> None:
+    """Call `listener(old, new)` whenever a reloaded snapshot is published."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _swap(config: BaseConfig) -> None:
+    global _config, _published
+    old, _config, _published = _published, config, config
+    if old is None or old == config:
+        return
+    for listener in list(_listeners):
+        listener(old, config)
+
+
+def _fingerprint(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+async def _watch(path: Path, interval: float) -> None:
+    fingerprint = await asyncio.to_thread(_fingerprint, path)
+    while True:
+        await asyncio.sleep(interval)
+        current = await asyncio.to_thread(_fingerprint, path)
+        if current is None or current == fingerprint:
+            continue
+        try:
+            await asyncio.to_thread(reload)
+        except Exception as error:
+            # keep serving the last good snapshot until the file is fixed
+            logging.getLogger(get_config().service).error(
+                {
+                    "message": "Config reload failed",
+                    "path": str(path),
+                    "error": str(error),
+                },
+                exc_info=True,
+            )
+            continue
+        fingerprint = current
+
+
+async def init():
+    global _watcher
+    config = get_config()
+    if config.watch.enabled and _watcher is None:
+        path = Path(Settings.model_config["yaml_file"])
+        _watcher = asyncio.create_task(_watch(path, config.watch.interval))
+
+
+async def close():
+    global _watcher
+    if _watcher:
+        _watcher.cancel()
+        _watcher = None
 
 
 Config = Annotated[BaseConfig, Depends(aget_config)]
@@ -1,21 +1,109 @@
-from typing import Annotated
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from itertools import count
+from typing import Annotated, Any
 from urllib.parse import quote
 
 from fastapi import Depends
+from sqlalchemy import event, exc, make_url, pool, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
+    async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from sqlmodel import Session
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .config import Config, get_config
+from .config import Config, Migrations, get_config
 from .logger import Logger, get_logger
 
 config: Config = get_config()
 logger: Logger = get_logger()
 
 _engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+@dataclass
+class PoolStats:
+    size: int = 0
+    checked_out: int = 0
+    overflow: int = 0
+    waiting: int = 0
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+_stats = PoolStats()
+
+
+class InstrumentedPool(pool.AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        _stats.waiting += 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            _stats.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _stats.waiting -= 1
+            _stats.wait_seconds_total += elapsed
+            _stats.wait_seconds_max = max(_stats.wait_seconds_max, elapsed)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _stats.checkouts += 1
+
+
+def pool_stats() -> PoolStats:
+    stats = PoolStats(**asdict(_stats))
+    if _engine is not None:
+        engine_pool = _engine.pool
+        stats.size = engine_pool.size()
+        stats.checked_out = engine_pool.checkedout()
+        stats.overflow = max(engine_pool.overflow(), 0)
+    return stats
+
+
+def _connect_args(url: str) -> dict[str, Any]:
+    connect_args = dict(config.database.connect_args)
+    if make_url(url).get_driver_name() == "psycopg":
+        if config.database.pgbouncer:
+            # a statement prepared on one server connection is unknown to
+            # the next one PgBouncer hands this client
+            connect_args["prepare_threshold"] = None
+        else:
+            connect_args.setdefault(
+                "prepare_threshold", config.database.prepare_threshold
+            )
+    return connect_args
+
+
+def _create_engine(url: str, **kwargs) -> AsyncEngine:
+    return create_async_engine(
+        url=url,
+        echo=config.logging.level == "debug",
+        future=True,
+        pool_size=config.database.pool_size,
+        max_overflow=config.database.max_overflow,
+        pool_timeout=config.database.pool_timeout,
+        pool_recycle=config.database.pool_recycle,
+        pool_pre_ping=config.database.pool_pre_ping,
+        pool_use_lifo=config.database.pool_use_lifo,
+        connect_args=_connect_args(url),
+        query_cache_size=config.database.query_cache_size,
+        **kwargs,
+    )
 
 
 def get_engine() -> AsyncEngine:
@@ -33,43 +121,255 @@ def get_engine() -> AsyncEngine:
 
         logger.info(f"creating database engine: {url}")
 
-        _engine = create_async_engine(
-            url=url,
-            echo=config.logging.level == "debug",
-            future=True,
-            pool_size=20,
-            max_overflow=10,
-        )
+        _engine = _create_engine(url, poolclass=InstrumentedPool)
+
+        event.listen(_engine.sync_engine, "checkout", _on_checkout)
 
     return _engine
 
 
-async def init():
-    import asyncio
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    name: str
+    healthy: bool = False
+    lag: float | None = None
+
+
+_replicas: list[Replica] = []
+_turn = count()
+_replica_monitor: asyncio.Task | None = None
+
+# session.info keys
+_REPLICA = "replica"
+_PINNED = "pinned_to_primary"
+
+# replay lag in seconds; 0 when caught up with everything it received, since
+# the last replayed transaction is old whenever the primary is idle
+_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def get_replicas() -> list[Replica]:
+    if not _replicas:
+        for url in config.database.replicas:
+            engine = _create_engine(url)
+            _replicas.append(
+                Replica(engine, name=f"{engine.url.host}:{engine.url.port}")
+            )
+    return _replicas
+
+
+def _choose_replica() -> Replica | None:
+    healthy = [replica for replica in _replicas if replica.healthy]
+    if not healthy:
+        return None
+    return healthy[next(_turn) % len(healthy)]
+
+
+async def _probe_replica(replica: Replica) -> None:
+    try:
+        async with asyncio.timeout(config.database.replica_check_interval):
+            async with replica.engine.connect() as connection:
+                lag = float(await connection.scalar(_LAG) or 0)
+    except Exception as error:
+        if replica.healthy:
+            logger.warning(
+                {
+                    "message": "Replica unavailable, reads fall back",
+                    "replica": replica.name,
+                    "error": str(error),
+                }
+            )
+        replica.healthy, replica.lag = False, None
+        return
+
+    healthy = lag <= config.database.replica_max_lag
+    if healthy != replica.healthy:
+        logger.info(
+            {
+                "message": "Replica serving reads"
+                if healthy
+                else "Replica lagging, reads fall back",
+                "replica": replica.name,
+                "lag": lag,
+            }
+        )
+    replica.healthy, replica.lag = healthy, lag
+
+
+async def probe_replicas() -> None:
+    await asyncio.gather(*(_probe_replica(r) for r in get_replicas()))
+
+
+async def _watch_replicas(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await probe_replicas()
+
+
+class RoutingSession(Session):
+    """Sends the statements of read-only scopes to a healthy replica.
+
+    Writes, and every statement after the session's first write, go to the
+    primary, so a request always reads its own writes. Without a healthy
+    replica everything goes to the primary.
+    """
 
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info[_PINNED] = True
+        replica = self.info.get(_REPLICA)
+        if replica is not None and not self.info.get(_PINNED):
+            return replica.engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+def pinned(session: AsyncSession) -> bool:
+    """Whether the session has written and now reads from the primary."""
+    return session.info.get(_PINNED, False)
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    global _session_factory
+
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(
+            bind=get_engine(),
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            expire_on_commit=False,
+        )
+
+    return _session_factory
+
+
+class SchemaOutOfDateError(RuntimeError):
+    def __init__(self, expected: set[str], actual: set[str]):
+        super().__init__(
+            f"database schema is at {sorted(actual) or 'base'}, "
+            f"expected {sorted(expected) or 'base'}; run `migrate` first"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade the schema to the latest revision (the `migrate` script)."""
     from alembic import command
     from alembic.config import Config as AlembicConfig
 
-    await asyncio.to_thread(
-        command.upgrade, config=AlembicConfig("alembic.ini"), revision="head"
+    command.upgrade(AlembicConfig(config.database.alembic_config), "head")
+
+
+def _script_heads() -> set[str]:
+    from alembic.config import Config as AlembicConfig
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(
+        AlembicConfig(config.database.alembic_config)
     )
+    return set(script.get_heads())
+
+
+async def _database_heads() -> set[str]:
+    async with get_engine().connect() as connection:
+        try:
+            result = await connection.execute(
+                text("SELECT version_num FROM alembic_version")
+            )
+        except exc.ProgrammingError:
+            # the table is created by the first upgrade
+            return set()
+        return set(result.scalars())
+
+
+async def check_schema() -> None:
+    """Fail unless `alembic_version` matches the migration scripts' heads.
+
+    Reading the heads does not run any migration code, and the query opens
+    the pool's first connection, which the first request then reuses.
+    """
+    expected, actual = await asyncio.gather(
+        asyncio.to_thread(_script_heads), _database_heads()
+    )
+    if expected != actual:
+        raise SchemaOutOfDateError(expected, actual)
+
+
+async def ping() -> None:
+    async with get_engine().connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def init():
+    global _replica_monitor
+
+    if config.database.migrations == Migrations.UPGRADE:
+        await asyncio.to_thread(upgrade)
+
+    if config.database.migrations == Migrations.SKIP:
+        await ping()
+    else:
+        await check_schema()
+
+    if get_replicas() and _replica_monitor is None:
+        await probe_replicas()
+        _replica_monitor = asyncio.create_task(
+            _watch_replicas(config.database.replica_check_interval)
+        )
 
 
 async def close():
-    global _engine
+    global _engine, _session_factory, _replica_monitor
+    _session_factory = None
+    if _replica_monitor:
+        _replica_monitor.cancel()
+        _replica_monitor = None
+    for replica in _replicas:
+        await replica.engine.dispose()
+    _replicas.clear()
     if _engine:
         await _engine.dispose()
         _engine = None
 
 
-async def aget_session() -> AsyncSession:
-    engine = get_engine()
-    session = sessionmaker(
-        bind=engine, class_=AsyncSession, expire_on_commit=False
-    )
+async def aget_session() -> AsyncIterator[AsyncSession]:
+    # the session only checks a connection out of the pool on its first
+    # statement, so routes that never query do not touch the pool
+    async with get_session_factory()() as session:
+        yield session
+
+
+@asynccontextmanager
+async def session_scope(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """Return the session's connection to the pool when the block exits.
+
+    Loaded objects stay usable (`expire_on_commit=False`), so repositories can
+    release the connection before the response is serialized instead of
+    holding it until dependency teardown.
+    """
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@asynccontextmanager
+async def read_scope(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """`session_scope` whose statements may be served by a replica.
 
-    async with session() as session:
+    One replica is chosen for the whole block, so its statements see the same
+    data. Only wrap methods that never write; a session that has written
+    earlier in the request keeps reading from the primary.
+    """
+    session.info[_REPLICA] = _choose_replica()
+    try:
         yield session
+    finally:
+        session.info.pop(_REPLICA, None)
+        await session.close()
 
 
 Database = Annotated[AsyncSession, Depends(aget_session)]
@@ -0,0 +1,130 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Annotated, TypeVar
+
+from fastapi import Depends
+
+from . import metrics
+from .config import Config, get_config
+
+config: Config = get_config()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+Flush = Callable[[list[T]], Awaitable[Sequence[R]]]
+
+
+class _Batch:
+    def __init__(self, flush: Flush) -> None:
+        self.flush = flush
+        self.items: list = []
+        self.waiters: list[asyncio.Future] = []
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class GroupCommitBatcher:
+    """Merges concurrent writes into one statement and one commit.
+
+    The first item submitted to a group opens a batch. Items submitted within
+    `window` seconds join it, and the batch is flushed when the window ends
+    or once it holds `max_size` items. `flush` gets the items in submission
+    order and returns one result per item, which goes back to the caller who
+    submitted it.
+
+    Flushes run as their own tasks, so a cancelled caller never fails the
+    rest of its batch. Its item is dropped if the batch has not been flushed
+    yet, and written anyway otherwise.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        window: float = 0.002,
+        max_size: int = 100,
+    ) -> None:
+        self.enabled = enabled
+        self.window = window
+        self.max_size = max_size
+        self._batches: dict[str, _Batch] = {}
+        self._flushing: set[asyncio.Task] = set()
+
+    async def submit(self, group: str, item: T, flush: Flush[T, R]) -> R:
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(group)
+        if batch is None:
+            batch = self._batches[group] = _Batch(flush)
+            batch.timer = loop.call_later(
+                self.window, self._flush, group, batch
+            )
+
+        waiter = loop.create_future()
+        batch.items.append(item)
+        batch.waiters.append(waiter)
+        if len(batch.items) >= self.max_size:
+            self._flush(group, batch)
+
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if self._batches.get(group) is batch:
+                index = batch.waiters.index(waiter)
+                del batch.items[index]
+                del batch.waiters[index]
+            raise
+
+    def _flush(self, group: str, batch: _Batch) -> None:
+        if self._batches.get(group) is not batch:
+            return
+        del self._batches[group]
+        batch.timer.cancel()
+        if batch.items:
+            task = asyncio.create_task(self._run(group, batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _run(self, group: str, batch: _Batch) -> None:
+        metrics.group_commit_batch_size.labels(group).observe(len(batch.items))
+        try:
+            results = await batch.flush(batch.items)
+            for waiter, result in zip(batch.waiters, results, strict=True):
+                if not waiter.done():
+                    waiter.set_result(result)
+        except asyncio.CancelledError:
+            for waiter in batch.waiters:
+                waiter.cancel()
+            raise
+        except Exception as error:
+            for waiter in batch.waiters:
+                if not waiter.done():
+                    waiter.set_exception(error)
+
+    async def drain(self) -> None:
+        """Flush every open batch now and wait for all flushes to finish."""
+        for group, batch in list(self._batches.items()):
+            self._flush(group, batch)
+        await asyncio.gather(*self._flushing, return_exceptions=True)
+
+
+_batcher: GroupCommitBatcher | None = None
+
+
+async def close():
+    global _batcher
+    if _batcher:
+        await _batcher.drain()
+        _batcher = None
+
+
+async def aget_group_commit() -> GroupCommitBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = GroupCommitBatcher(
+            enabled=config.group_commit.enabled,
+            window=config.group_commit.window,
+            max_size=config.group_commit.max_rows,
+        )
+    return _batcher
+
+
+GroupCommit = Annotated[GroupCommitBatcher, Depends(aget_group_commit)]
@@ -0,0 +1,120 @@
+import asyncio
+import functools
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
+from importlib import metadata
+
+from . import cache, database, http_client
+from .config import Config, get_config
+from .logger import Logger, get_logger
+
+config: Config = get_config()
+logger: Logger = get_logger()
+
+Check = Callable[[], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    healthy: bool
+    latency_ms: float
+    checked_at: datetime
+    error: str | None = None
+
+
+@functools.cache
+def version() -> str:
+    """Installed version of the service, read from disk once."""
+    try:
+        return metadata.version(config.service)
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+async def _cache() -> None:
+    await (await cache.aget_cache()).ping()
+
+
+async def _http_client() -> None:
+    client = await http_client.aget_client()
+    if client.is_closed:
+        raise RuntimeError("client is closed")
+    if config.health.http_url:
+        response = await client.get(config.health.http_url)
+        response.raise_for_status()
+
+
+_checks: dict[str, Check] = {
+    "database": database.ping,
+    "cache": _cache,
+    "http_client": _http_client,
+}
+_results: dict[str, ProbeResult] = {}
+_refreshed_at = 0.0
+_prober: asyncio.Task | None = None
+
+
+async def _probe(name: str, check: Check) -> ProbeResult:
+    start = time.perf_counter()
+    error = None
+    try:
+        await asyncio.wait_for(check(), config.health.timeout)
+    except TimeoutError:
+        error = f"timed out after {config.health.timeout}s"
+    except Exception as exception:
+        error = str(exception) or type(exception).__name__
+    if error is not None:
+        logger.warning(
+            {"message": "Readiness probe failed", "name": name, "error": error}
+        )
+    return ProbeResult(
+        healthy=error is None,
+        latency_ms=round((time.perf_counter() - start) * 1000, 2),
+        checked_at=datetime.now(),
+        error=error,
+    )
+
+
+async def refresh() -> dict[str, ProbeResult]:
+    """Probe every dependency concurrently and publish the results."""
+    global _results, _refreshed_at
+    names = list(_checks)
+    results = await asyncio.gather(
+        *(_probe(name, _checks[name]) for name in names)
+    )
+    _results = dict(zip(names, results, strict=True))
+    _refreshed_at = time.monotonic()
+    return _results
+
+
+def results() -> dict[str, ProbeResult]:
+    """Last published probe results, without touching any dependency."""
+    return _results
+
+
+def stale() -> bool:
+    # a prober that stopped publishing must not keep reporting ready
+    return time.monotonic() - _refreshed_at > 3 * config.health.interval
+
+
+async def _run(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await refresh()
+
+
+async def init():
+    global _prober
+    version()
+    if _prober is None:
+        await refresh()
+        _prober = asyncio.create_task(_run(config.health.interval))
+
+
+async def close():
+    global _prober
+    if _prober:
+        _prober.cancel()
+        _prober = None
@@ -1,15 +1,222 @@
+import asyncio
+import random
+import time
 from typing import Annotated
 
+import httpx
 from fastapi import Depends
 from httpx import AsyncClient
 
+from . import metrics
+from .config import Config, get_config
+from .logger import Logger, get_logger
+
+config: Config = get_config()
+logger: Logger = get_logger()
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without sending the request while the host's circuit is open.
+
+    A transport error like any other to callers of the client, so code that
+    already handles `httpx.TransportError` needs no special case.
+    """
+
+    def __init__(self, host: str, request: httpx.Request) -> None:
+        self.host = host
+        super().__init__(f"Circuit open for {host}", request=request)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one upstream host.
+
+    After `threshold` failures in a row the circuit opens and requests fail
+    fast for `reset` seconds. Then a single trial request is let through:
+    success closes the circuit, failure opens it for another `reset`.
+    """
+
+    def __init__(self, threshold: int, reset: float) -> None:
+        self.threshold = threshold
+        self.reset = reset
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial = False
+
+    @property
+    def open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.trial or time.monotonic() - self.opened_at < self.reset:
+            return False
+        self.trial = True
+        return True
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.trial or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self.trial = False
+
+    def abandon(self) -> None:
+        # a cancelled trial request must not keep the circuit half-open
+        self.trial = False
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Per-host connection pools with retries and circuit breaking.
+
+    Every upstream (scheme, host, port) gets its own pool and breaker, so a
+    slow host can only exhaust its own connections. Idempotent requests with
+    a replayable body are retried on transport errors and on
+    `retry_statuses`, sleeping a fully jittered exponential backoff.
+    """
+
+    def __init__(self, settings) -> None:
+        self.settings = settings
+        self._pools: dict[str, httpx.AsyncHTTPTransport] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def _pool(self, host: str) -> httpx.AsyncHTTPTransport:
+        pool = self._pools.get(host)
+        if pool is None:
+            pool = self._pools[host] = httpx.AsyncHTTPTransport(
+                http2=self.settings.http2,
+                limits=httpx.Limits(
+                    max_connections=self.settings.max_connections,
+                    max_keepalive_connections=(
+                        self.settings.max_keepalive_connections
+                    ),
+                    keepalive_expiry=self.settings.keepalive_expiry,
+                ),
+            )
+        return pool
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                self.settings.breaker_failures, self.settings.breaker_reset
+            )
+        return breaker
+
+    def _retryable(self, request: httpx.Request) -> bool:
+        return request.method in self.settings.retry_methods and isinstance(
+            request.stream, httpx.ByteStream
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(
+            self.settings.retry_backoff_max,
+            self.settings.retry_backoff * 2**attempt,
+        )
+        return random.uniform(0, ceiling)
+
+    def _observe(
+        self,
+        host: str,
+        outcome: str,
+        start: float,
+        pool: httpx.AsyncHTTPTransport,
+        breaker: CircuitBreaker,
+    ) -> None:
+        metrics.http_client_requests.labels(host, outcome).inc()
+        metrics.http_client_request_duration.labels(host).observe(
+            time.perf_counter() - start
+        )
+        metrics.http_client_circuit_open.labels(host).set(int(breaker.open))
+        # httpx does not expose pool occupancy, so read the httpcore pool
+        # when it is there
+        connections = getattr(getattr(pool, "_pool", None), "connections", None)
+        if connections is None:
+            return
+        idle = sum(connection.is_idle() for connection in connections)
+        metrics.http_client_pool_connections.labels(host, "idle").set(idle)
+        metrics.http_client_pool_connections.labels(host, "active").set(
+            len(connections) - idle
+        )
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        host = f"{request.url.scheme}://{request.url.netloc.decode('ascii')}"
+        pool = self._pool(host)
+        breaker = self._breaker(host)
+        retries = self.settings.retries if self._retryable(request) else 0
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                metrics.http_client_requests.labels(host, "circuit_open").inc()
+                raise CircuitOpenError(host, request)
+
+            last = attempt == retries
+            start = time.perf_counter()
+            try:
+                response = await pool.handle_async_request(request)
+            except httpx.TransportError as error:
+                breaker.failure()
+                self._observe(host, "error", start, pool, breaker)
+                if last:
+                    raise
+                logger.warning(
+                    {
+                        "message": "Retrying outbound request",
+                        "host": host,
+                        "attempt": attempt + 1,
+                        "error": repr(error),
+                    }
+                )
+            except BaseException:
+                breaker.abandon()
+                raise
+            else:
+                if response.status_code >= 500:
+                    breaker.failure()
+                else:
+                    breaker.success()
+                self._observe(
+                    host, str(response.status_code), start, pool, breaker
+                )
+                if last or response.status_code not in (
+                    self.settings.retry_statuses
+                ):
+                    return response
+                await response.aclose()
+
+            metrics.http_client_retries.labels(host).inc()
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    async def aclose(self) -> None:
+        for pool in self._pools.values():
+            await pool.aclose()
+        self._pools.clear()
+
+
 _client: AsyncClient | None = None
 
 
 async def init():
     global _client
     if _client is None:
-        _client = AsyncClient(timeout=60)
+        settings = config.http_client
+        _client = AsyncClient(
+            transport=ResilientTransport(settings),
+            timeout=httpx.Timeout(
+                connect=settings.connect_timeout,
+                read=settings.read_timeout,
+                write=settings.write_timeout,
+                pool=settings.pool_timeout,
+            ),
+        )
 
 
 async def close():
@@ -1,39 +1,249 @@
+import asyncio
 import logging
+import queue
 import sys
-from typing import Annotated
+from collections.abc import Callable, Iterator, Mapping
+from logging.handlers import QueueHandler, QueueListener
+from typing import TYPE_CHECKING, Annotated, Any
 
 from fastapi import Depends
-from google.cloud.logging.handlers import StructuredLogHandler
-from opentelemetry import _logs
-from opentelemetry.exporter.cloud_logging import (
-    CloudLoggingExporter,
+from opentelemetry import context as otel_context
+
+from .config import (
+    BaseConfig,
+    Config,
+    Exporter,
+    LogOverflow,
+    get_config,
+    subscribe,
 )
-from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
-from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
-from opentelemetry.sdk.resources import Resource
 
-from .config import Config, get_config
+if TYPE_CHECKING:
+    from opentelemetry.sdk._logs import LoggerProvider
+    from opentelemetry.sdk._logs.export import LogExporter
 
 config: Config = get_config()
 
 
+class Lazy(Mapping[str, Any]):
+    """Structured log payload that is only built if the record is emitted.
+
+    `logger.debug(Lazy(lambda: {"sample": sample.model_dump()}))` costs one
+    closure when DEBUG is disabled.
+    """
+
+    __slots__ = ("_factory", "_payload")
+
+    def __init__(self, factory: Callable[[], Mapping[str, Any]]) -> None:
+        self._factory = factory
+        self._payload: Mapping[str, Any] | None = None
+
+    def materialize(self) -> Mapping[str, Any]:
+        if self._payload is None:
+            self._payload = self._factory()
+        return self._payload
+
+    def __getitem__(self, key: str) -> Any:
+        return self.materialize()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.materialize())
+
+    def __len__(self) -> int:
+        return len(self.materialize())
+
+    def __str__(self) -> str:
+        return str(self.materialize())
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Hands records to a bounded queue instead of writing them inline.
+
+    Payloads are materialized here, on the calling thread, so the listener
+    thread never touches request objects; serialization and I/O happen there.
+    """
+
+    def __init__(self, queue: queue.Queue, overflow: LogOverflow) -> None:
+        super().__init__(queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.msg, Lazy):
+            record.msg = record.msg.materialize()
+        elif record.args:
+            record.msg, record.args = record.getMessage(), None
+        # handlers running on the listener thread read the active span
+        record.otel_context = otel_context.get_current()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow == LogOverflow.BLOCK:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            self.dropped += 1
+            if self.overflow == LogOverflow.DROP_NEWEST:
+                return
+        try:
+            self.queue.get_nowait()
+            # the evicted record is never handled, so it is done already
+            self.queue.task_done()
+            self.queue.put_nowait(record)
+        except (queue.Empty, queue.Full):
+            pass
+
+
+class ContextQueueListener(QueueListener):
+    """Emits each record under the OpenTelemetry context it was logged in."""
+
+    def enqueue_sentinel(self) -> None:
+        # blocks until the listener makes room, where `put_nowait` would
+        # raise `queue.Full` when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+    def handle(self, record: logging.LogRecord) -> None:
+        context = getattr(record, "otel_context", None)
+        token = otel_context.attach(context) if context is not None else None
+        try:
+            super().handle(record)
+        finally:
+            if token is not None:
+                otel_context.detach(token)
+
+
+_handler: BoundedQueueHandler | None = None
+_listener: QueueListener | None = None
+_provider: "LoggerProvider | None" = None
+_exporter: "LogExporter | None" = None
+
+
+def _create_exporter() -> "LogExporter | None":
+    # exporters and the SDK are imported here, not at module level, so that
+    # importing the package stays cheap for scripts and disabled telemetry
+    match config.observability.exporter:
+        case Exporter.GCP:
+            from opentelemetry.exporter.cloud_logging import (
+                CloudLoggingExporter,
+            )
+
+            return CloudLoggingExporter(default_log_name=config.service)
+        case Exporter.OTLP:
+            from opentelemetry.exporter.otlp.proto.http._log_exporter import (
+                OTLPLogExporter,
+            )
+
+            endpoint = config.observability.otlp_endpoint
+            return OTLPLogExporter(
+                endpoint=f"{endpoint.rstrip('/')}/v1/logs"
+                if endpoint
+                else None,
+            )
+        case Exporter.CONSOLE:
+            from opentelemetry.sdk._logs.export import ConsoleLogExporter
+
+            return ConsoleLogExporter()
+        case Exporter.MEMORY:
+            from opentelemetry.sdk._logs.export import InMemoryLogExporter
+
+            return InMemoryLogExporter()
+        case _:
+            return None
+
+
+def _apply_level(old: BaseConfig, new: BaseConfig) -> None:
+    if old.logging.level != new.logging.level:
+        logging.getLogger(config.service).setLevel(new.logging.level.upper())
+
+
 async def init():
-    logger_provider = LoggerProvider(
-        resource=Resource.create({"service.name": config.service}),
-    )
+    global _handler, _listener, _provider, _exporter
 
-    _logs.set_logger_provider(logger_provider)
+    from google.cloud.logging.handlers import StructuredLogHandler
+
+    handlers: list[logging.Handler] = [StructuredLogHandler(stream=sys.stdout)]
+
+    _exporter = _create_exporter()
+    if _exporter is not None:
+        from opentelemetry import _logs
+        from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+        from opentelemetry.sdk._logs.export import (
+            BatchLogRecordProcessor,
+            SimpleLogRecordProcessor,
+        )
+        from opentelemetry.sdk.resources import Resource
 
-    _logs.get_logger_provider().add_log_record_processor(
-        BatchLogRecordProcessor(
-            CloudLoggingExporter(default_log_name=config.service),
+        _provider = LoggerProvider(
+            resource=Resource.create({"service.name": config.service}),
         )
+
+        _logs.set_logger_provider(_provider)
+
+        if config.observability.exporter in (Exporter.GCP, Exporter.OTLP):
+            _provider.add_log_record_processor(
+                BatchLogRecordProcessor(
+                    _exporter,
+                    max_queue_size=config.observability.max_queue_size,
+                    max_export_batch_size=(
+                        config.observability.max_export_batch_size
+                    ),
+                    schedule_delay_millis=(
+                        config.observability.schedule_delay_millis
+                    ),
+                    export_timeout_millis=(
+                        config.observability.export_timeout_millis
+                    ),
+                )
+            )
+        else:
+            _provider.add_log_record_processor(
+                SimpleLogRecordProcessor(_exporter)
+            )
+
+        handlers.append(LoggingHandler(logger_provider=_provider))
+
+    records = queue.Queue(maxsize=config.logging.queue_size)
+    _listener = ContextQueueListener(
+        records,
+        *handlers,
+        respect_handler_level=True,
     )
+    _listener.start()
+    _handler = BoundedQueueHandler(records, config.logging.overflow)
 
     logger = logging.getLogger(config.service)
     logger.setLevel(config.logging.level.upper())
-    logger.addHandler(StructuredLogHandler(stream=sys.stdout))
-    logger.addHandler(LoggingHandler())
+    logger.addHandler(_handler)
+
+    subscribe(_apply_level)
+
+
+async def close():
+    global _handler, _listener, _provider, _exporter
+    if _handler:
+        logging.getLogger(config.service).removeHandler(_handler)
+        _handler = None
+    if _listener:
+        # drains the queue before returning
+        await asyncio.to_thread(_listener.stop)
+        _listener = None
+    if _provider:
+        await asyncio.to_thread(_provider.shutdown)
+        _provider = None
+        _exporter = None
+
+
+def get_exporter() -> "LogExporter | None":
+    """The active log exporter, e.g. the `InMemoryLogExporter` in tests."""
+    return _exporter
+
+
+def dropped() -> int:
+    """Number of records discarded because the queue was full."""
+    return _handler.dropped if _handler else 0
 
 
 async def aget_logger() -> logging.Logger:
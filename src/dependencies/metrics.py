@@ -0,0 +1,298 @@
+import asyncio
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import default
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from . import database
+from .config import Config, get_config
+
+config: Config = get_config()
+
+DB_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+DB_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+# how SQLAlchemy obtained the compiled form of an executed statement
+CACHE_RESULTS = {
+    default.CACHE_HIT: "hit",
+    default.CACHE_MISS: "miss",
+    default.CACHING_DISABLED: "disabled",
+    default.NO_CACHE_KEY: "uncacheable",
+    default.NO_DIALECT_SUPPORT: "uncacheable",
+}
+
+http_requests = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route"],
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds",
+    "Database statement latency by SQL operation.",
+    ["operation"],
+    buckets=DB_BUCKETS,
+)
+db_compiled_cache = Counter(
+    "db_compiled_cache_total",
+    "Executions by SQL operation and compiled statement cache result.",
+    ["operation", "result"],
+)
+db_pool_size = Gauge(
+    "db_pool_size",
+    "Configured connection pool size.",
+    multiprocess_mode="livesum",
+)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+db_pool_overflow = Gauge(
+    "db_pool_overflow",
+    "Connections currently open beyond the pool size.",
+    multiprocess_mode="livesum",
+)
+db_pool_waiting = Gauge(
+    "db_pool_waiting",
+    "Requests currently waiting for a pool connection.",
+    multiprocess_mode="livesum",
+)
+db_pool_checkouts = Counter(
+    "db_pool_checkouts_total",
+    "Connections checked out of the pool.",
+)
+db_pool_timeouts = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after the pool timeout.",
+)
+db_pool_wait = Counter(
+    "db_pool_wait_seconds_total",
+    "Time spent waiting for a pool connection.",
+)
+db_replica_lag = Gauge(
+    "db_replica_lag_seconds",
+    "Replay lag of each read replica at its last probe.",
+    ["replica"],
+    multiprocess_mode="livemax",
+)
+db_replica_healthy = Gauge(
+    "db_replica_healthy",
+    "1 while the read replica serves reads.",
+    ["replica"],
+    multiprocess_mode="livemin",
+)
+http_client_requests = Counter(
+    "http_client_requests_total",
+    "Outbound request attempts by upstream host and outcome.",
+    ["host", "outcome"],
+)
+http_client_request_duration = Histogram(
+    "http_client_request_duration_seconds",
+    "Outbound time to response headers by upstream host, per attempt.",
+    ["host"],
+)
+http_client_retries = Counter(
+    "http_client_retries_total",
+    "Outbound requests retried by upstream host.",
+    ["host"],
+)
+http_client_circuit_open = Gauge(
+    "http_client_circuit_open",
+    "1 while the upstream host's circuit breaker rejects requests.",
+    ["host"],
+    multiprocess_mode="livemax",
+)
+http_client_pool_connections = Gauge(
+    "http_client_pool_connections",
+    "Pooled outbound connections by upstream host and state.",
+    ["host", "state"],
+    multiprocess_mode="livesum",
+)
+singleflight_calls = Counter(
+    "singleflight_calls_total",
+    "Coalesced calls by group and role (leader ran it, follower joined).",
+    ["group", "role"],
+)
+admission_requests = Counter(
+    "admission_requests_total",
+    "Requests by route class and admission outcome (admitted, queued, shed).",
+    ["route_class", "outcome"],
+)
+admission_queue_wait = Histogram(
+    "admission_queue_wait_seconds",
+    "Time queued requests waited for an admission slot.",
+    ["route_class"],
+    buckets=DB_BUCKETS,
+)
+admission_limit = Gauge(
+    "admission_limit",
+    "Current adaptive concurrency limit by route class.",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+admission_in_flight = Gauge(
+    "admission_in_flight",
+    "Admitted requests currently being served by route class.",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+group_commit_batch_size = Histogram(
+    "group_commit_batch_size",
+    "Rows per group-commit flush; its count is the number of commits.",
+    ["group"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds",
+    "Delay of a timer callback past its deadline.",
+    buckets=LAG_BUCKETS,
+)
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().partition(" ")[0].upper()
+    return keyword if keyword in DB_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    start = conn.info["query_start"].pop()
+    operation = _operation(statement)
+    db_statement_duration.labels(operation).observe(time.perf_counter() - start)
+    if context is not None:
+        db_compiled_cache.labels(
+            operation, CACHE_RESULTS.get(context.cache_hit, "uncacheable")
+        ).inc()
+
+
+def _handle_error(context):
+    if context.connection is None:
+        return
+    starts = context.connection.info.get("query_start")
+    if starts:
+        starts.pop()
+
+
+def instrument(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if event.contains(
+        sync_engine, "before_cursor_execute", _before_cursor_execute
+    ):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class _PoolSampler:
+    """Copies pool stats and replica state into this process's gauges."""
+
+    def __init__(self) -> None:
+        self.previous = database.PoolStats()
+
+    def sample(self) -> None:
+        stats = database.pool_stats()
+        db_pool_size.set(stats.size)
+        db_pool_checked_out.set(stats.checked_out)
+        db_pool_overflow.set(stats.overflow)
+        db_pool_waiting.set(stats.waiting)
+        db_pool_checkouts.inc(stats.checkouts - self.previous.checkouts)
+        db_pool_timeouts.inc(stats.timeouts - self.previous.timeouts)
+        db_pool_wait.inc(
+            stats.wait_seconds_total - self.previous.wait_seconds_total
+        )
+        self.previous = stats
+
+        for replica in database.get_replicas():
+            db_replica_healthy.labels(replica.name).set(int(replica.healthy))
+            if replica.lag is not None:
+                db_replica_lag.labels(replica.name).set(replica.lag)
+
+
+async def _monitor(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    sampler = _PoolSampler()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(loop.time() - start - interval, 0.0))
+        sampler.sample()
+
+
+_monitor_task: asyncio.Task | None = None
+
+
+def multiprocess_mode() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+async def init():
+    global _monitor_task
+    if not config.metrics.enabled:
+        return
+    instrument(database.get_engine())
+    for replica in database.get_replicas():
+        instrument(replica.engine)
+    if _monitor_task is None:
+        _monitor_task = asyncio.create_task(_monitor(config.metrics.interval))
+
+
+async def close():
+    global _monitor_task
+    if _monitor_task:
+        _monitor_task.cancel()
+        _monitor_task = None
+    if multiprocess_mode():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render() -> tuple[bytes, str]:
+    """Exposition of every metric, aggregated across workers if needed."""
+    if multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
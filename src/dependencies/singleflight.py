@@ -0,0 +1,104 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Annotated, TypeVar
+
+from fastapi import Depends
+
+from . import metrics
+from .config import Config, get_config
+
+config: Config = get_config()
+
+T = TypeVar("T")
+
+
+def _cancelling() -> bool:
+    return asyncio.current_task().cancelling() > 0
+
+
+class SingleFlightGroup:
+    """Coalesces concurrent identical calls into one execution.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight await the same result or exception instead of
+    running it again; the exception is re-raised without the leader's
+    traceback. Nothing is kept once the call finishes, so a flight
+    never serves a result older than the call it joined.
+
+    A follower's cancellation never affects the flight. If the leader is
+    cancelled, its followers start over and one of them becomes the leader.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._flights: dict[str, dict[Hashable, asyncio.Future]] = {}
+
+    async def do(
+        self,
+        group: str,
+        key: Hashable,
+        call: Callable[[], Awaitable[T]],
+    ) -> T:
+        if not self.enabled:
+            return await call()
+
+        flights = self._flights.setdefault(group, {})
+        while (flight := flights.get(key)) is not None:
+            metrics.singleflight_calls.labels(group, "follower").inc()
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # start over only if the leader was cancelled, not this caller
+                if not flight.cancelled() or _cancelling():
+                    raise
+            except Exception as error:
+                # every follower raises the same instance; drop the frames
+                # earlier raises added so its traceback does not keep growing
+                raise error.with_traceback(None)
+
+        metrics.singleflight_calls.labels(group, "leader").inc()
+        flight = asyncio.get_running_loop().create_future()
+        flights[key] = flight
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as error:
+            flight.set_exception(error)
+            # followers re-raise it; without any, do not log it as unretrieved
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if flights.get(key) is flight:
+                del flights[key]
+
+    def forget(self, group: str, key: Hashable | None = None) -> None:
+        """Make later calls start a new flight instead of joining this one.
+
+        Writers call this after committing, so a read that starts after the
+        write cannot be served by a query that started before it.
+        """
+        flights = self._flights.get(group)
+        if not flights:
+            return
+        if key is None:
+            flights.clear()
+        else:
+            flights.pop(key, None)
+
+
+_group: SingleFlightGroup | None = None
+
+
+async def aget_singleflight() -> SingleFlightGroup:
+    global _group
+    if _group is None:
+        _group = SingleFlightGroup(enabled=config.api.single_flight)
+    return _group
+
+
+SingleFlight = Annotated[SingleFlightGroup, Depends(aget_singleflight)]
@@ -0,0 +1,38 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from .logger import Logger, get_logger
+
+logger: Logger = get_logger()
+
+_phases: dict[str, float] = {}
+
+
+def record(name: str, seconds: float) -> None:
+    _phases[name] = _phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the block as one phase of the startup report."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def report() -> dict[str, float]:
+    """Log how long each startup phase took, in milliseconds."""
+    phases = {
+        name: round(seconds * 1000, 1) for name, seconds in _phases.items()
+    }
+    logger.info(
+        {
+            "message": "Startup complete",
+            "phases_ms": phases,
+            "total_ms": round(sum(phases.values()), 1),
+        }
+    )
+    return phases
@@ -1,41 +1,151 @@
+import asyncio
 import inspect
 from collections.abc import Callable, Iterator
-from contextlib import asynccontextmanager, contextmanager
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 
 import wrapt
 from opentelemetry import trace
-from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
-from opentelemetry.propagate import set_global_textmap
-from opentelemetry.propagators.cloud_trace_propagator import (
-    CloudTraceFormatPropagator,
-)
-from opentelemetry.sdk.resources import Attributes, Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.semconv.trace import SpanAttributes
 from opentelemetry.trace import SpanKind
 from opentelemetry.trace.span import Span
 from opentelemetry.trace.status import StatusCode
-
-from .config import Config, aget_config, get_config
+from opentelemetry.util.types import Attributes
+
+from .config import Config, Exporter, get_config
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SpanExporter
+
+config: Config = get_config()
+
+# a proxy until init() installs the provider, then resolved once
+_tracer = trace.get_tracer(config.service)
+_provider: "TracerProvider | None" = None
+_exporter: "SpanExporter | None" = None
+# set by init() when no trace can ever be sampled
+_disabled = False
+
+
+def _create_exporter() -> "SpanExporter | None":
+    # the SDK and exporters are only imported once tracing is initialized
+    match config.observability.exporter:
+        case Exporter.GCP:
+            from opentelemetry.exporter.cloud_trace import (
+                CloudTraceSpanExporter,
+            )
+
+            return CloudTraceSpanExporter(resource_regex=r".*")
+        case Exporter.OTLP:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+
+            endpoint = config.observability.otlp_endpoint
+            return OTLPSpanExporter(
+                endpoint=f"{endpoint.rstrip('/')}/v1/traces"
+                if endpoint
+                else None,
+            )
+        case Exporter.CONSOLE:
+            from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+            return ConsoleSpanExporter()
+        case Exporter.MEMORY:
+            from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+                InMemorySpanExporter,
+            )
+
+            return InMemorySpanExporter()
+        case _:
+            return None
 
 
 async def init():
-    config: Config = await aget_config()
+    global _provider, _exporter, _disabled
+
+    _exporter = _create_exporter()
+    _disabled = _exporter is None or config.observability.sample_rate == 0
+    if _exporter is None:
+        # the API's no-op provider stays installed
+        return
+
+    from opentelemetry.propagate import set_global_textmap
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import (
+        ParentBased,
+        TraceIdRatioBased,
+    )
 
-    tracer_provider = TracerProvider(
+    _provider = TracerProvider(
         resource=Resource.create({"service.name": config.service}),
+        sampler=ParentBased(
+            TraceIdRatioBased(config.observability.sample_rate)
+        ),
     )
-
-    trace.set_tracer_provider(tracer_provider)
-
-    trace.get_tracer_provider().add_span_processor(
+    # exporting never runs on the request path, whatever the exporter;
+    # tests using `memory` call `force_flush()` before reading spans
+    _provider.add_span_processor(
         BatchSpanProcessor(
-            CloudTraceSpanExporter(resource_regex=r".*"),
+            _exporter,
+            max_queue_size=config.observability.max_queue_size,
+            max_export_batch_size=config.observability.max_export_batch_size,
+            schedule_delay_millis=config.observability.schedule_delay_millis,
+            export_timeout_millis=config.observability.export_timeout_millis,
         )
     )
 
-    set_global_textmap(CloudTraceFormatPropagator())
+    trace.set_tracer_provider(_provider)
+
+    if config.observability.exporter == Exporter.GCP:
+        from opentelemetry.propagators.cloud_trace_propagator import (
+            CloudTraceFormatPropagator,
+        )
+
+        set_global_textmap(CloudTraceFormatPropagator())
+    else:
+        from opentelemetry.baggage.propagation import W3CBaggagePropagator
+        from opentelemetry.propagators.composite import CompositePropagator
+        from opentelemetry.trace.propagation.tracecontext import (
+            TraceContextTextMapPropagator,
+        )
+
+        set_global_textmap(
+            CompositePropagator(
+                [TraceContextTextMapPropagator(), W3CBaggagePropagator()]
+            )
+        )
+
+
+async def close():
+    global _provider, _exporter, _disabled
+    _disabled = False
+    if _provider:
+        # flushes pending spans
+        await asyncio.to_thread(_provider.shutdown)
+        _provider = None
+        _exporter = None
+
+
+def get_exporter() -> "SpanExporter | None":
+    """The active span exporter, e.g. the `InMemorySpanExporter` in tests."""
+    return _exporter
+
+
+def _unsampled() -> bool:
+    """Whether the current trace was already dropped by the sampler.
+
+    Children of an unsampled span are never recorded (`ParentBased`), so
+    there is no point in creating them. With tracing off or a zero sample
+    rate no span is recorded at all, not even a root.
+    """
+    if _disabled:
+        return True
+    context = trace.get_current_span().get_span_context()
+    return context.is_valid and not context.trace_flags.sampled
 
 
 @asynccontextmanager
@@ -43,10 +153,11 @@ async def track(
     name: str,
     attributes: Attributes | None = None,
 ) -> Iterator[Span]:
-    config: Config = await aget_config()
-    tracer = trace.get_tracer(config.service)
+    if _unsampled():
+        yield trace.get_current_span()
+        return
 
-    with tracer.start_as_current_span(
+    with _tracer.start_as_current_span(
         name,
         kind=SpanKind.INTERNAL,
         record_exception=True,
@@ -58,43 +169,59 @@ async def track(
         span.set_status(StatusCode.OK)
 
 
-@contextmanager
-def create_span(func: Callable):
-    config: Config = get_config()
-    tracer = trace.get_tracer(config.service)
+def _code_attributes(func: Callable) -> Attributes:
+    attributes = {
+        SpanAttributes.CODE_FUNCTION: func.__qualname__,
+        SpanAttributes.CODE_NAMESPACE: func.__module__,
+    }
+    try:
+        attributes[SpanAttributes.CODE_FILEPATH] = inspect.getfile(func)
+    except TypeError:
+        pass
+    return attributes
 
-    with tracer.start_as_current_span(
-        func.__qualname__,
-        kind=SpanKind.INTERNAL,
-        record_exception=True,
-        set_status_on_exception=True,
-        end_on_exit=True,
-    ) as span:
-        span.set_attribute(SpanAttributes.CODE_FUNCTION, func.__qualname__)
-        span.set_attribute(SpanAttributes.CODE_NAMESPACE, func.__module__)
-        span.set_attribute(SpanAttributes.CODE_FILEPATH, inspect.getfile(func))
-        yield span
-        span.set_status(StatusCode.OK)
 
+def observe(wrapped=None):
+    if wrapped is None:
+        return observe
+
+    # everything that does not change between calls is resolved once here
+    name = wrapped.__qualname__
+    attributes = _code_attributes(wrapped)
+
+    def start_span():
+        return _tracer.start_as_current_span(
+            name,
+            kind=SpanKind.INTERNAL,
+            record_exception=True,
+            set_status_on_exception=True,
+            end_on_exit=True,
+            attributes=attributes,
+        )
 
-@wrapt.decorator
-def _observe(wrapped, instance, args, kwargs):
     if inspect.iscoroutinefunction(wrapped):
 
-        async def _awrapper():
-            with create_span(wrapped):
+        @wrapt.decorator
+        async def _awrapper(wrapped, instance, args, kwargs):
+            if _unsampled():
                 return await wrapped(*args, **kwargs)
+            with start_span() as span:
+                result = await wrapped(*args, **kwargs)
+                span.set_status(StatusCode.OK)
+                return result
 
-        return _awrapper()
-    else:
-        with create_span(wrapped):
-            return wrapped(*args, **kwargs)
+        return _awrapper(wrapped)
 
+    @wrapt.decorator
+    def _wrapper(wrapped, instance, args, kwargs):
+        if _unsampled():
+            return wrapped(*args, **kwargs)
+        with start_span() as span:
+            result = wrapped(*args, **kwargs)
+            span.set_status(StatusCode.OK)
+            return result
 
-def observe(wrapped=None):
-    if wrapped is None:
-        return _observe
-    return _observe(wrapped)
+    return _wrapper(wrapped)
 
 
 __all__ = ["observe", "track"]
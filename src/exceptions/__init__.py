@@ -1,10 +1,16 @@
 from .base_exception import BaseError as BaseError
+from .bulk_exception import (
+    BulkLimitExceededError as BulkLimitExceededError,
+)
 from .health_exception import (
     CacheHealthError as CacheHealthError,
 )
 from .health_exception import (
     DatabaseHealthError as DatabaseHealthError,
 )
+from .page_exception import (
+    InvalidCursorError as InvalidCursorError,
+)
 from .sample_exception import (
     SampleAlreadyExistsError as SampleAlreadyExistsError,
 )
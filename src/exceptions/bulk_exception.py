@@ -0,0 +1,9 @@
+from .base_exception import BaseError
+
+
+class BulkLimitExceededError(BaseError):
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=413,
+            message=f"Bulk Limit Exceeded: at most {limit} items per request",
+        )
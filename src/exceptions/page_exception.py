@@ -0,0 +1,6 @@
+from .base_exception import BaseError
+
+
+class InvalidCursorError(BaseError):
+    def __init__(self):
+        super().__init__(status_code=400, message="Invalid Cursor")
@@ -1,6 +1,5 @@
 from contextlib import asynccontextmanager
 
-import uvicorn
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,20 +15,56 @@ from src.dependencies import (
     get_logger,
 )
 from src.exceptions import BaseError
-from src.routers import HealthRouter, SampleRouter
+from src.middlewares import (
+    AdmissionMiddleware,
+    CompressionMiddleware,
+    MetricsMiddleware,
+)
+from src.routers import HealthRouter, MetricsRouter, SampleRouter
+from src.schemas import FastJSONResponse
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    from src.dependencies import database, http_client, logger, tracer
+    from src.dependencies import (
+        cache,
+        config,
+        database,
+        group_commit,
+        health,
+        http_client,
+        logger,
+        metrics,
+        startup,
+        tracer,
+    )
 
-    await database.init()
-    await tracer.init()
-    await logger.init()
-    await http_client.init()
+    with startup.phase("config"):
+        await config.init()
+    with startup.phase("engine"):
+        database.get_engine()
+    with startup.phase("first connection"):
+        await database.init()
+    with startup.phase("telemetry"):
+        await tracer.init()
+        await logger.init()
+    with startup.phase("clients"):
+        await cache.init()
+        await http_client.init()
+        await metrics.init()
+    with startup.phase("readiness"):
+        await health.init()
+    startup.report()
     yield
+    await health.close()
+    await metrics.close()
     await http_client.close()
+    await cache.close()
+    await group_commit.close()
     await database.close()
+    await tracer.close()
+    await logger.close()
+    await config.close()
 
 
 config: Config = get_config()
@@ -38,6 +73,8 @@ logger: Logger = get_logger()
 
 title = "Service Name - Swagger UI"  # TODO: service name
 
+response_class = FastJSONResponse if config.api.fast_response else JSONResponse
+
 
 app = FastAPI(
     lifespan=lifespan,
@@ -48,6 +85,7 @@ app = FastAPI(
         "email": "author@example.com",  # TODO: author email
     },
     docs_url=None,
+    default_response_class=response_class,
 )
 
 
@@ -55,6 +93,9 @@ app = FastAPI(
 # Middlewares
 # ===============
 add_pagination(app)
+if config.admission.enabled:
+    # inside CORS, so shed responses still carry CORS headers
+    app.add_middleware(AdmissionMiddleware, settings=config.admission)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -62,12 +103,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if config.compression.enabled:
+    app.add_middleware(CompressionMiddleware, settings=config.compression)
+if config.metrics.enabled:
+    app.add_middleware(MetricsMiddleware)
 
 
 # ===============
 # Routers
 # ===============
 app.include_router(HealthRouter)
+if config.metrics.enabled:
+    app.include_router(MetricsRouter)
 app.include_router(SampleRouter)
 
 
@@ -77,7 +124,7 @@ app.include_router(SampleRouter)
 @app.exception_handler(BaseError)
 async def http_exception_handler(request, exception):
     logger.error(exception.message, exc_info=True)
-    return JSONResponse(
+    return response_class(
         status_code=exception.status_code,
         content={
             "status_code": exception.status_code,
@@ -98,7 +145,7 @@ async def validation_exception_handler(request, exception):
             data[field_string] = []
         data[field_string].append(msg)
 
-    return JSONResponse(
+    return response_class(
         status_code=400,
         content={
             "status_code": 400,
@@ -130,11 +177,48 @@ if config.environment != Environment.PRD:
 # ===============
 # WSGI
 # ===============
+def migrate():
+    from src.dependencies import database
+
+    database.upgrade()
+
+
 def server():
-    uvicorn.run(
-        app="src:app",
-        host="0.0.0.0",
-        port=config.port,
-        log_level=config.logging.level.lower(),
-        reload=True if config.environment == Environment.LOCAL else False,
+    import os
+    import tempfile
+    from contextlib import ExitStack
+
+    import uvicorn
+
+    settings = config.server
+    reload = (
+        settings.reload
+        if settings.reload is not None
+        else config.environment == Environment.LOCAL
     )
+    # the reloader only supports a single worker
+    workers = 1 if reload else settings.workers or os.cpu_count() or 1
+    with ExitStack() as stack:
+        if workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+            # workers write their samples here and /metrics merges them;
+            # removed on exit, a configured directory is left alone
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = stack.enter_context(
+                tempfile.TemporaryDirectory(prefix="metrics-")
+            )
+
+        uvicorn.run(
+            app="src:app",
+            host=config.host,
+            port=config.port,
+            log_level=config.logging.level.lower(),
+            reload=reload,
+            workers=workers,
+            loop=settings.loop,
+            http=settings.http,
+            backlog=settings.backlog,
+            limit_concurrency=settings.limit_concurrency,
+            limit_max_requests=settings.limit_max_requests,
+            timeout_keep_alive=settings.timeout_keep_alive,
+            timeout_graceful_shutdown=settings.timeout_graceful_shutdown,
+            h11_max_incomplete_event_size=settings.h11_max_incomplete_event_size,
+        )
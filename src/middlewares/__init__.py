@@ -0,0 +1,7 @@
+from .admission_middleware import (
+    AdmissionMiddleware as AdmissionMiddleware,
+)
+from .compression_middleware import (
+    CompressionMiddleware as CompressionMiddleware,
+)
+from .metrics_middleware import MetricsMiddleware as MetricsMiddleware
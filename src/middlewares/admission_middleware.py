@@ -0,0 +1,187 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.dependencies import config, metrics
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+class AdaptiveLimit:
+    """Gradient concurrency limit for one route class.
+
+    The limit only moves on completions while the class is saturated, i.e.
+    its limit is in full use or requests are queued; a slow request without
+    contention says nothing about the limit. Then the smoothed latency is
+    compared with the class's no-load latency, measured on completions
+    without contention. Within `tolerance` times that, the limit grows by
+    `1 / limit`, i.e. by one per limit's worth of requests. Above it, the
+    limit is multiplied by `backoff`, at most once per observed latency so
+    one burst of slow requests counts as one signal.
+
+    Requests over the limit wait in FIFO order. One whose estimated wait
+    exceeds `max_wait` is rejected at once instead of joining the queue, and
+    one that still waits `max_wait` gives up.
+    """
+
+    def __init__(self, name: str, settings: config.RouteClass) -> None:
+        self.name = name
+        self.settings = settings
+        self.limit = float(settings.initial_limit)
+        self.in_flight = 0
+        # moving average of admitted requests' latency
+        self.latency = 0.0
+        # slower moving average of their latency without contention
+        self.no_load_latency = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._decreased_at = 0.0
+        metrics.admission_limit.labels(name).set(self.limit)
+
+    def estimated_wait(self) -> float:
+        # a full class completes about `limit / latency` requests per second
+        return (len(self._waiters) + 1) * self.latency / self.limit
+
+    async def acquire(self) -> bool:
+        """Take a slot, queueing if needed; False means the request is shed."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self._admit("admitted")
+            return True
+        if self.estimated_wait() > self.settings.max_wait:
+            metrics.admission_requests.labels(self.name, "shed").inc()
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.settings.max_wait):
+                await waiter
+        except TimeoutError:
+            if not self._abandon(waiter):
+                metrics.admission_requests.labels(self.name, "shed").inc()
+                return False
+        except BaseException:
+            if self._abandon(waiter):
+                self.release(0.0)
+            raise
+        metrics.admission_queue_wait.labels(self.name).observe(
+            time.perf_counter() - start
+        )
+        return True
+
+    def release(self, latency: float) -> None:
+        saturated = self.in_flight >= int(self.limit) or bool(self._waiters)
+        self.in_flight -= 1
+        metrics.admission_in_flight.labels(self.name).set(self.in_flight)
+        if latency:
+            self._adapt(latency, saturated)
+        self._wake()
+
+    def _abandon(self, waiter: asyncio.Future) -> bool:
+        """Leave the queue; True if a slot was handed over just before."""
+        if waiter.done() and not waiter.cancelled():
+            return True
+        waiter.cancel()
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        return False
+
+    def _admit(self, outcome: str) -> None:
+        self.in_flight += 1
+        metrics.admission_in_flight.labels(self.name).set(self.in_flight)
+        metrics.admission_requests.labels(self.name, outcome).inc()
+
+    def _adapt(self, latency: float, saturated: bool) -> None:
+        if not self.latency:
+            self.latency = self.no_load_latency = latency
+        self.latency += 0.1 * (latency - self.latency)
+        if not saturated:
+            self.no_load_latency += 0.05 * (latency - self.no_load_latency)
+            return
+        if self.latency > self.settings.tolerance * self.no_load_latency:
+            now = time.monotonic()
+            if now - self._decreased_at < self.latency:
+                return
+            self._decreased_at = now
+            self.limit = max(
+                float(self.settings.min_limit),
+                self.limit * self.settings.backoff,
+            )
+        else:
+            self.limit = min(
+                float(self.settings.max_limit), self.limit + 1 / self.limit
+            )
+        metrics.admission_limit.labels(self.name).set(self.limit)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._admit("queued")
+
+
+class AdmissionMiddleware:
+    """Caps concurrent requests per route class and sheds excess load.
+
+    Reads (GET, HEAD) and writes are limited separately by an `AdaptiveLimit`
+    fed with each request's time to response headers. Paths in `exempt`,
+    such as probes and the streamed export, are never limited. A request that cannot
+    be admitted within the class's `max_wait` gets a 503 with `Retry-After`,
+    rather than queueing for a database connection until `pool_timeout` and
+    slowing down every request already admitted.
+    """
+
+    def __init__(self, app: ASGIApp, settings: config.Admission) -> None:
+        self.app = app
+        self.exempt = frozenset(settings.exempt)
+        self.limits = {
+            "read": AdaptiveLimit("read", settings.read),
+            "write": AdaptiveLimit("write", settings.write),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits[
+            "read" if scope["method"] in READ_METHODS else "write"
+        ]
+        if not await limit.acquire():
+            await self._shed(limit, scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        latency = 0.0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal latency
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limit.release(latency or time.perf_counter() - start)
+
+    @staticmethod
+    async def _shed(
+        limit: AdaptiveLimit, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        retry_after = max(1, math.ceil(limit.estimated_wait()))
+        response = JSONResponse(
+            status_code=503,
+            content={
+                "status_code": 503,
+                "message": "Service Overloaded",
+                "data": None,
+            },
+            headers={"Retry-After": str(retry_after)},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,269 @@
+import functools
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.dependencies import config, get_logger
+
+logger = get_logger()
+
+COMPRESSIBLE = frozenset(
+    {
+        "application/json",
+        "application/x-ndjson",
+        "application/xml",
+        "application/javascript",
+    }
+)
+# no body, or a body whose bytes the client addressed explicitly
+UNCOMPRESSED_STATUSES = frozenset({204, 206, 304})
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Everything buffered so far, keeping the stream open."""
+        ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(
+            level, zlib.DEFLATED, zlib.MAX_WBITS | 16
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, brotli, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, zstandard, level: int) -> None:
+        self._block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        # one compressor per response: they must not be shared while in use
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(self._block)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _unavailable(encoding: str, package: str) -> None:
+    logger.warning(
+        {
+            "message": "Compression encoding disabled",
+            "encoding": encoding,
+            "reason": f"{package} is not installed",
+        }
+    )
+
+
+def encoders(
+    settings: config.Compression,
+) -> dict[str, Callable[[], Encoder]]:
+    """Encoder factories for the configured encodings, in preference order.
+
+    brotli and zstandard are optional; an encoding whose package is missing
+    is left out rather than failing startup.
+    """
+    available: dict[str, Callable[[], Encoder]] = {}
+    for encoding in settings.encodings:
+        match encoding:
+            case config.Encoding.GZIP:
+                available[encoding] = functools.partial(
+                    GzipEncoder, settings.gzip_level
+                )
+            case config.Encoding.BR:
+                try:
+                    import brotli
+                except ImportError:
+                    _unavailable(encoding, "brotli")
+                    continue
+                available[encoding] = functools.partial(
+                    BrotliEncoder, brotli, settings.brotli_quality
+                )
+            case config.Encoding.ZSTD:
+                try:
+                    import zstandard
+                except ImportError:
+                    _unavailable(encoding, "zstandard")
+                    continue
+                available[encoding] = functools.partial(
+                    ZstdEncoder, zstandard, settings.zstd_level
+                )
+    return available
+
+
+@functools.lru_cache(maxsize=64)
+def negotiate(accept_encoding: str, available: tuple[str, ...]) -> str | None:
+    """Encoding with the highest q-value, ties going to `available` order."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[token] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def _compressible(status: int, headers: Headers) -> bool:
+    if status < 200 or status in UNCOMPRESSED_STATUSES:
+        return False
+    if "content-encoding" in headers or "content-range" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", "").lower():
+        return False
+    media_type = headers.get("content-type", "").partition(";")[0]
+    media_type = media_type.strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+class CompressionMiddleware:
+    """Compresses response bodies with gzip, br or zstd.
+
+    The encoding is negotiated from `Accept-Encoding`. A complete body is
+    compressed in one go when it reaches `minimum_size`. A streamed body is
+    compressed chunk by chunk, flushing after each chunk so the client keeps
+    receiving data as it is produced. Responses that are already encoded,
+    partial or not a text-like media type pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, settings: config.Compression) -> None:
+        self.app = app
+        self.minimum_size = settings.minimum_size
+        self.encoders = encoders(settings)
+        self.available = tuple(self.encoders)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.available:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding")
+        encoding = (
+            negotiate(accept_encoding, self.available)
+            if accept_encoding
+            else None
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        encoder: Encoder | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if _compressible(
+                    message["status"], Headers(raw=message["headers"])
+                ):
+                    # held back until the first body chunk shows its size
+                    start = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                passthrough = True
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                response_start, start = start, None
+                headers = MutableHeaders(raw=response_start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                length = headers.get("content-length")
+                if (not more_body and len(body) < self.minimum_size) or (
+                    length is not None and int(length) < self.minimum_size
+                ):
+                    passthrough = True
+                    await send(response_start)
+                    await send(message)
+                    return
+
+                encoder = self.encoders[encoding]()
+                headers["Content-Encoding"] = encoding
+                if not more_body:
+                    body = encoder.compress(body) + encoder.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(response_start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                await send(response_start)
+
+            if more_body and not body:
+                return
+            chunk = encoder.compress(body)
+            chunk += encoder.flush() if more_body else encoder.finish()
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": more_body,
+                }
+            )
+
+        await self.app(scope, receive, send_wrapper)
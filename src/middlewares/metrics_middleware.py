@@ -0,0 +1,46 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.dependencies import metrics
+
+
+class MetricsMiddleware:
+    """Records request count, latency and in-flight requests per route.
+
+    Requests are labelled with the route template (`/samples/{id}`) rather
+    than the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = metrics.http_requests_in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            # set by the router once a route matched
+            route = scope.get("route")
+            template = route.path if route is not None else "<unmatched>"
+            metrics.http_request_duration.labels(method, template).observe(
+                elapsed
+            )
+            metrics.http_requests.labels(method, template, status).inc()
@@ -1,6 +1,9 @@
 from .sample_model import (
     Sample as Sample,
 )
+from .sample_model import (
+    SampleBulkUpdate as SampleBulkUpdate,
+)
 from .sample_model import (
     SampleCreate as SampleCreate,
 )
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Index, SQLModel
 
 
 class SampleBase(SQLModel):
@@ -10,6 +10,10 @@ class SampleBase(SQLModel):
 
 class Sample(SampleBase, table=True):
     __tablename__: str = "samples"
+    __table_args__ = (
+        # keyset pagination order, see SampleRepository.read_all_cursor
+        Index("ix_samples_created_at_id", "created_at", "id"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
@@ -29,3 +33,7 @@ class SamplePublic(SampleBase):
 
 class SampleUpdate(SampleBase):
     name: str | None = None
+
+
+class SampleBulkUpdate(SampleUpdate):
+    id: UUID
@@ -1,24 +1,38 @@
 from sqlalchemy import select
 
-from src.dependencies import Database
-from src.exceptions import DatabaseHealthError
+from src.dependencies import Cache, Database, database
+from src.exceptions import CacheHealthError, DatabaseHealthError
 
 
 class HealthRepository:
     db: Database
+    cache: Cache
 
     def __init__(
         self,
         db: Database,
+        cache: Cache,
     ) -> None:
         self.db = db
+        self.cache = cache
 
     async def check(
         self,
     ) -> bool:
         try:
-            await self.db.exec(select(1))
+            async with database.session_scope(self.db):
+                await self.db.exec(select(1))
         except Exception:
             raise DatabaseHealthError()
 
         return True
+
+    async def check_cache(
+        self,
+    ) -> bool:
+        try:
+            await self.cache.ping()
+        except Exception:
+            raise CacheHealthError()
+
+        return True
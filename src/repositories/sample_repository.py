@@ -1,10 +1,39 @@
+import math
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from itertools import batched
 from uuid import UUID
 
 from fastapi_pagination.ext.sqlmodel import paginate
+from pydantic_core import from_json, to_json
+from sqlalchemy import (
+    ARRAY,
+    Row,
+    String,
+    Uuid,
+    any_,
+    bindparam,
+    column,
+    func,
+    literal,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlmodel import delete, insert, select, update
 
-from src.dependencies import Database, Logger, tracer
+from src.dependencies import (
+    Cache,
+    Config,
+    Database,
+    GroupCommit,
+    Lazy,
+    Logger,
+    database,
+    to_utc,
+    tracer,
+)
 from src.exceptions import (
     BaseError,
     SampleAlreadyExistsError,
@@ -12,19 +41,104 @@ from src.exceptions import (
 )
 from src.models import (
     Sample,
+    SampleBulkUpdate,
     SampleCreate,
     SampleUpdate,
 )
-from src.schemas import Page
+from src.schemas import Cursor, CursorPage, CursorParams, Page, TotalMode
+
+# Fixed-shape statements are built once and take every value as a bound
+# parameter: each compiles once per engine, later executions hit SQLAlchemy's
+# compiled cache, and psycopg can prepare them server-side.
+_CREATE = insert(Sample).returning(Sample)
+_CREATE_MANY = pg_insert(Sample).on_conflict_do_nothing().returning(Sample)
+_READ_ALL = select(Sample).order_by(Sample.created_at, Sample.id)
+_READ = select(Sample).where(Sample.id == bindparam("id"))
+_READ_VERSION = select(Sample.updated_at).where(Sample.id == bindparam("id"))
+_COUNT = select(func.count()).select_from(Sample)
+# planner statistics: O(1) regardless of table size, refreshed by
+# (auto)vacuum/analyze; -1 means the table was never analyzed
+_ESTIMATE = text(
+    "SELECT reltuples::bigint FROM pg_class "
+    "WHERE oid = CAST(:table AS regclass)"
+).bindparams(table=Sample.__tablename__)
+_STREAM = select(Sample.id, Sample.name).order_by(Sample.created_at, Sample.id)
+# arrays instead of a VALUES list, so the SQL is the same for any chunk size
+_UPDATES = (
+    func.unnest(
+        bindparam("ids", type_=ARRAY(Uuid)),
+        bindparam("names", type_=ARRAY(String)),
+    )
+    .table_valued(column("id", Uuid), column("name", String))
+    .render_derived(name="data")
+)
+_UPDATE_MANY = (
+    update(Sample)
+    .where(Sample.id == _UPDATES.c.id)
+    .values(name=func.coalesce(_UPDATES.c.name, Sample.name))
+    .returning(Sample)
+    .execution_options(synchronize_session=False)
+)
+_DELETE_MANY = (
+    delete(Sample)
+    .where(Sample.id == any_(bindparam("ids", type_=ARRAY(Uuid))))
+    .returning(Sample.id, Sample.updated_at)
+    .execution_options(synchronize_session=False)
+)
+_DELETE = (
+    delete(Sample)
+    .where(Sample.id == bindparam("id"))
+    .returning(Sample.updated_at)
+    .execution_options(synchronize_session=False)
+)
 
 
 class SampleRepository:
+    config: Config
     db: Database
+    cache: Cache
     logger: Logger
+    group_commit: GroupCommit
 
-    def __init__(self, db: Database, logger: Logger) -> None:
+    def __init__(
+        self,
+        config: Config,
+        db: Database,
+        cache: Cache,
+        logger: Logger,
+        group_commit: GroupCommit,
+    ) -> None:
+        self.config = config
         self.db = db
+        self.cache = cache
         self.logger = logger
+        self.group_commit = group_commit
+
+    @staticmethod
+    def _cache_key(id: UUID) -> str:
+        return f"sample:{id}"
+
+    @staticmethod
+    def _version(updated_at: datetime, deleted: bool = False) -> float:
+        """Cache version of a row, taken from its `updated_at`.
+
+        Read with `to_utc`, like the conditional request validators, so both
+        agree on the instant a naive `updated_at` stands for. A deleted
+        row's version sits just above its last one, so its tombstone also
+        beats a reader that fetched that last version before the delete.
+        """
+        version = to_utc(updated_at).timestamp()
+        if deleted:
+            return math.nextafter(version, math.inf)
+        return version
+
+    def pinned(self) -> bool:
+        """Whether reads in this request must go to the primary."""
+        return database.pinned(self.db)
+
+    async def _invalidate(self, ids: list[UUID], version: float) -> None:
+        for id in ids:
+            await self.cache.invalidate(self._cache_key(id), version)
 
     @tracer.observe()
     async def create(
@@ -33,19 +147,16 @@ class SampleRepository:
     ) -> Sample:
         try:
             data = Sample.model_validate(sample)
-            result = (
-                await self.db.scalars(
-                    insert(Sample).values(data.model_dump()).returning(Sample),
+            if self.group_commit.enabled:
+                result = await self.group_commit.submit(
+                    "create", data, self._create_batch
                 )
-            ).one()
-            await self.db.commit()
-            self.logger.debug(
-                {
-                    "message": "Sample created in DB",
-                    "sample": result.model_dump(mode="json"),
-                }
-            )
-            return result
+            else:
+                async with database.session_scope(self.db):
+                    result = (
+                        await self.db.scalars(_CREATE, data.model_dump())
+                    ).one()
+                    await self.db.commit()
         except IntegrityError as error:
             self.logger.warning(
                 {
@@ -64,15 +175,87 @@ class SampleRepository:
             )
             raise BaseError("Database Internal Error") from error
 
+        if result is None:
+            self.logger.warning(
+                {
+                    "message": "Sample creation failed: already exists",
+                    "sample_id": str(data.id),
+                }
+            )
+            raise SampleAlreadyExistsError()
+        self.logger.debug(
+            Lazy(
+                lambda: {
+                    "message": "Sample created in DB",
+                    "sample": result.model_dump(mode="json"),
+                }
+            )
+        )
+        return result
+
+    @staticmethod
+    async def _create_batch(samples: list[Sample]) -> list[Sample | None]:
+        """Insert a group-commit batch with one statement and one commit.
+
+        Uses its own session, as a batch belongs to no single request.
+        `None` marks a sample that hit a conflict.
+        """
+        async with database.get_session_factory()() as session:
+            created = {
+                sample.id: sample
+                for sample in await session.scalars(
+                    _CREATE_MANY, [sample.model_dump() for sample in samples]
+                )
+            }
+            await session.commit()
+        # of several samples with the same id, only the first was inserted
+        return [created.pop(sample.id, None) for sample in samples]
+
+    @tracer.observe()
+    async def create_many(
+        self,
+        samples: list[SampleCreate],
+    ) -> list[Sample | None]:
+        """Insert in chunks; `None` marks an item that hit a conflict."""
+        rows = [
+            Sample.model_validate(sample).model_dump() for sample in samples
+        ]
+        results: list[Sample | None] = []
+        try:
+            async with database.session_scope(self.db):
+                for chunk in batched(rows, self.config.bulk.chunk_size):
+                    created = {
+                        sample.id: sample
+                        for sample in await self.db.scalars(
+                            _CREATE_MANY, list(chunk)
+                        )
+                    }
+                    results.extend(created.get(row["id"]) for row in chunk)
+                await self.db.commit()
+            self.logger.debug(
+                {
+                    "message": "Samples created in DB",
+                    "count": sum(result is not None for result in results),
+                }
+            )
+            return results
+        except Exception as error:
+            self.logger.error(
+                {
+                    "message": "Database error during create_many",
+                    "error": str(error),
+                },
+                exc_info=True,
+            )
+            raise BaseError("Database Internal Error") from error
+
     @tracer.observe()
     async def read_all(
         self,
     ) -> Page[Sample]:
         try:
-            return await paginate(
-                self.db,
-                select(Sample),
-            )
+            async with database.read_scope(self.db):
+                return await paginate(self.db, _READ_ALL)
         except Exception as error:
             self.logger.error(
                 {
@@ -83,17 +266,121 @@ class SampleRepository:
             )
             raise BaseError("Database Internal Error") from error
 
+    @tracer.observe()
+    async def read_all_cursor(
+        self,
+        params: CursorParams,
+    ) -> CursorPage[Sample]:
+        cursor = Cursor.decode(params.cursor) if params.cursor else None
+        backward = cursor is not None and cursor.backward
+
+        statement = select(Sample)
+        if cursor is not None:
+            position = tuple_(Sample.created_at, Sample.id)
+            bound = tuple_(literal(cursor.created_at), literal(cursor.id))
+            statement = statement.where(
+                position < bound if backward else position > bound
+            )
+        if backward:
+            statement = statement.order_by(
+                Sample.created_at.desc(), Sample.id.desc()
+            )
+        else:
+            statement = statement.order_by(Sample.created_at, Sample.id)
+        statement = statement.limit(params.size + 1)
+
+        try:
+            async with database.read_scope(self.db):
+                items = list((await self.db.exec(statement)).all())
+                total = await self._count(params.total)
+        except Exception as error:
+            self.logger.error(
+                {
+                    "message": "Database error during read_all_cursor",
+                    "error": str(error),
+                },
+                exc_info=True,
+            )
+            raise BaseError("Database Internal Error") from error
+
+        has_more = len(items) > params.size
+        items = items[: params.size]
+        if backward:
+            items.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        page = CursorPage[Sample](items=items, size=params.size, total=total)
+        if items:
+            first, last = items[0], items[-1]
+            if has_next:
+                page.next_cursor = Cursor(
+                    created_at=last.created_at, id=last.id
+                ).encode()
+            if has_previous:
+                page.previous_cursor = Cursor(
+                    created_at=first.created_at, id=first.id, backward=True
+                ).encode()
+        return page
+
+    async def _count(self, mode: TotalMode) -> int | None:
+        if mode == TotalMode.EXACT:
+            return (await self.db.exec(_COUNT)).one()
+        if mode == TotalMode.ESTIMATED:
+            estimate = await self.db.scalar(_ESTIMATE)
+            return estimate if estimate >= 0 else None
+        return None
+
+    async def stream(
+        self,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield `(id, name)` rows in batches from a server-side cursor.
+
+        Uses its own session: the request-scoped one is closed during
+        dependency teardown, before a streaming body is sent. Closing the
+        generator (e.g. on client disconnect) closes the cursor and returns
+        the connection to the pool.
+        """
+        try:
+            async with (
+                database.get_session_factory()() as session,
+                database.read_scope(session),
+            ):
+                result = await session.stream(
+                    _STREAM.execution_options(
+                        yield_per=self.config.export.fetch_size
+                    ),
+                )
+                async for rows in result.partitions():
+                    yield rows
+        except Exception as error:
+            self.logger.error(
+                {
+                    "message": "Database error during stream",
+                    "error": str(error),
+                },
+                exc_info=True,
+            )
+            raise BaseError("Database Internal Error") from error
+
     @tracer.observe()
     async def read(
         self,
         id: UUID,
     ) -> Sample | None:
+        cached = await self.cache.get(self._cache_key(id))
+        if cached is not None:
+            return Sample.model_validate(from_json(cached))
+
         try:
-            result = (
-                await self.db.exec(
-                    select(Sample).where(Sample.id == id),
-                )
-            ).one()
+            async with database.read_scope(self.db):
+                result = (await self.db.exec(_READ, params={"id": id})).one()
+            await self.cache.set(
+                self._cache_key(id),
+                to_json(result.model_dump(mode="json")),
+                self._version(result.updated_at),
+            )
             return result
         except NoResultFound as error:
             self.logger.warning(
@@ -113,6 +400,39 @@ class SampleRepository:
             )
             raise BaseError("Database Internal Error") from error
 
+    @tracer.observe()
+    async def read_version(
+        self,
+        id: UUID,
+    ) -> datetime:
+        """Return only `updated_at`, for answering conditional requests."""
+        cached = await self.cache.get(self._cache_key(id))
+        if cached is not None:
+            return Sample.model_validate(from_json(cached)).updated_at
+
+        try:
+            async with database.read_scope(self.db):
+                return (
+                    await self.db.exec(_READ_VERSION, params={"id": id})
+                ).one()
+        except NoResultFound as error:
+            self.logger.warning(
+                {
+                    "message": "Sample not found",
+                    "sample_id": str(id),
+                }
+            )
+            raise SampleNotFoundError() from error
+        except Exception as error:
+            self.logger.error(
+                {
+                    "message": "Database error during read_version",
+                    "error": str(error),
+                },
+                exc_info=True,
+            )
+            raise BaseError("Database Internal Error") from error
+
     @tracer.observe()
     async def update(
         self,
@@ -120,26 +440,114 @@ class SampleRepository:
         sample: SampleUpdate,
     ) -> Sample:
         try:
-            result = (
-                await self.db.scalars(
-                    update(Sample)
-                    .where(Sample.id == id)
-                    .values(sample.model_dump(mode="json", exclude_none=True))
-                    .returning(Sample),
+            async with database.session_scope(self.db):
+                result = (
+                    await self.db.scalars(
+                        update(Sample)
+                        .where(Sample.id == id)
+                        .values(
+                            sample.model_dump(mode="json", exclude_none=True)
+                        )
+                        .returning(Sample),
+                    )
+                ).one()
+                await self.db.commit()
+            await self._invalidate([id], self._version(result.updated_at))
+            self.logger.debug(
+                Lazy(
+                    lambda: {
+                        "message": "Sample updated in DB",
+                        "sample": result.model_dump(mode="json"),
+                    }
+                )
+            )
+            return result
+        except Exception as error:
+            self.logger.error(
+                {
+                    "message": "Database error during update",
+                    "error": str(error),
+                },
+                exc_info=True,
+            )
+            raise BaseError("Database Internal Error") from error
+
+    @tracer.observe()
+    async def update_many(
+        self,
+        samples: list[SampleBulkUpdate],
+    ) -> list[Sample | None]:
+        """Update in chunks; `None` marks an item whose id does not exist."""
+        results: list[Sample | None] = []
+        try:
+            async with database.session_scope(self.db):
+                for chunk in batched(samples, self.config.bulk.chunk_size):
+                    updated = {
+                        sample.id: sample
+                        for sample in await self.db.scalars(
+                            _UPDATE_MANY,
+                            {
+                                "ids": [sample.id for sample in chunk],
+                                "names": [sample.name for sample in chunk],
+                            },
+                        )
+                    }
+                    results.extend(updated.get(sample.id) for sample in chunk)
+                await self.db.commit()
+            for result in results:
+                if result is not None:
+                    await self._invalidate(
+                        [result.id], self._version(result.updated_at)
+                    )
+            self.logger.debug(
+                {
+                    "message": "Samples updated in DB",
+                    "count": sum(result is not None for result in results),
+                }
+            )
+            return results
+        except Exception as error:
+            self.logger.error(
+                {
+                    "message": "Database error during update_many",
+                    "error": str(error),
+                },
+                exc_info=True,
+            )
+            raise BaseError("Database Internal Error") from error
+
+    @tracer.observe()
+    async def delete_many(
+        self,
+        ids: list[UUID],
+    ) -> list[bool]:
+        """Delete in chunks; `False` marks an id that did not exist."""
+        deleted: dict[UUID, datetime] = {}
+        try:
+            async with database.session_scope(self.db):
+                for chunk in batched(ids, self.config.bulk.chunk_size):
+                    deleted.update(
+                        (row.id, row.updated_at)
+                        for row in await self.db.exec(
+                            _DELETE_MANY, params={"ids": list(chunk)}
+                        )
+                    )
+                await self.db.commit()
+            for id, updated_at in deleted.items():
+                await self._invalidate(
+                    [id], self._version(updated_at, deleted=True)
                 )
-            ).one()
-            await self.db.commit()
             self.logger.debug(
                 {
-                    "message": "Sample updated in DB",
-                    "sample": result.model_dump(mode="json"),
+                    "message": "Samples deleted from DB",
+                    "count": len(deleted),
                 }
             )
-            return result
+            return [id in deleted for id in ids]
         except Exception as error:
             self.logger.error(
                 {
-                    "message": "Database error during update",
+                    "message": "Database error during delete_many",
                     "error": str(error),
                 },
                 exc_info=True,
@@ -152,8 +560,15 @@ class SampleRepository:
         id: UUID,
     ) -> None:
         try:
-            await self.db.exec(delete(Sample).where(Sample.id == id))
-            await self.db.commit()
+            async with database.session_scope(self.db):
+                updated_at = (
+                    await self.db.scalars(_DELETE, {"id": id})
+                ).one_or_none()
+                await self.db.commit()
+            if updated_at is not None:
+                await self._invalidate(
+                    [id], self._version(updated_at, deleted=True)
+                )
             self.logger.debug(
                 {
                     "message": "Sample deleted from DB",
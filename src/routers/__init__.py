@@ -1,2 +1,3 @@
 from .health_router import HealthRouter as HealthRouter
+from .metrics_router import MetricsRouter as MetricsRouter
 from .sample_router import SampleRouter as SampleRouter
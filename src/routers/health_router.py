@@ -1,7 +1,8 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 
+from src.dependencies.health import version
 from src.schemas import HealthCheck
 from src.services import HealthService
 
@@ -29,3 +30,41 @@ async def health(
         HealthCheck: Returns a JSON response with the health status
     """
     return await health_service.check()
+
+
+@HealthRouter.get(
+    "/livez",
+    summary="Liveness Probe",
+    response_description="Return HTTP Status Code 200 (OK)",
+    status_code=status.HTTP_200_OK,
+)
+async def livez() -> HealthCheck:
+    """
+    ## Liveness Probe
+    Answers as long as the process can serve requests. Has no dependencies,
+    so it never touches the database, cache or upstream services and a slow
+    dependency cannot get healthy instances restarted.
+    """
+    return HealthCheck(version=version())
+
+
+@HealthRouter.get(
+    "/readyz",
+    summary="Readiness Probe",
+    response_description="Return HTTP Status Code 200 (OK) or 503",
+    status_code=status.HTTP_200_OK,
+)
+async def readyz(
+    health_service: Annotated[HealthService, Depends()],
+    response: Response,
+) -> HealthCheck:
+    """
+    ## Readiness Probe
+    Returns the last result of the background dependency probes (database,
+    cache, HTTP client) without probing them itself. Answers 503 when any
+    dependency failed or the results are stale.
+    """
+    health_check = await health_service.ready()
+    if health_check.status != "OK":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return health_check
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from src.dependencies import metrics
+
+MetricsRouter = APIRouter(
+    tags=["metrics"],
+    include_in_schema=False,
+)
+
+
+@MetricsRouter.get("/metrics")
+async def metrics_endpoint() -> Response:
+    """Prometheus exposition of the service metrics."""
+    content, media_type = metrics.render()
+    return Response(content=content, media_type=media_type)
@@ -1,23 +1,63 @@
-from typing import Annotated
+from typing import Annotated, Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Body, Depends, Query, status
+from fastapi.responses import Response as HttpResponse
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
-from src.dependencies import Logger, tracer
+from src.dependencies import (
+    Conditional,
+    Config,
+    Lazy,
+    Logger,
+    get_config,
+    make_etag,
+    tracer,
+)
 from src.models import (
+    SampleBulkUpdate,
     SampleCreate,
     SamplePublic,
     SampleUpdate,
 )
-from src.schemas import Page, Response
+from src.schemas import (
+    BulkResult,
+    CursorPage,
+    CursorParams,
+    ExportFormat,
+    FastJSONResponse,
+    Page,
+    Response,
+)
 from src.services import SampleService
 
+config: Config = get_config()
+
 SampleRouter = APIRouter(
     prefix="/samples",
     tags=["sample"],
 )
 
 
+def _respond(
+    model: type[BaseModel],
+    content: Any,
+    response: HttpResponse | None = None,
+) -> Any:
+    """Hand `content` to FastAPI, or validate and render it in one pass.
+
+    The single pass only runs in fast response mode (`api.fast_response`).
+    """
+    if not config.api.fast_response:
+        return content
+    return FastJSONResponse.validated(
+        model,
+        content,
+        headers=response.headers if response is not None else None,
+    )
+
+
 @SampleRouter.post("/")
 @tracer.observe()
 async def create(
@@ -25,23 +65,123 @@ async def create(
     sample_service: Annotated[SampleService, Depends()],
     sample: SampleCreate,
 ) -> Response[SamplePublic]:
+    logger.info(
+        Lazy(
+            lambda: {
+                "message": "Creating a new sample",
+                "sample": sample.model_dump(mode="json"),
+            }
+        )
+    )
+    data = await sample_service.create(sample)
+    logger.info(
+        Lazy(
+            lambda: {
+                "message": "Sample created successfully",
+                "sample": data.model_dump(mode="json"),
+            }
+        )
+    )
+    return _respond(
+        Response[SamplePublic],
+        Response(
+            status=status.HTTP_200_OK,
+            message="Sample created successfully",
+            data=data,
+        ),
+    )
+
+
+@SampleRouter.post("/bulk")
+@tracer.observe()
+async def create_many(
+    logger: Logger,
+    sample_service: Annotated[SampleService, Depends()],
+    samples: list[SampleCreate],
+) -> Response[BulkResult[SamplePublic]]:
     logger.info(
         {
-            "message": "Creating a new sample",
-            "sample": sample.model_dump(mode="json"),
+            "message": "Creating samples in bulk",
+            "count": len(samples),
         }
     )
-    data = await sample_service.create(sample)
+    data = await sample_service.create_many(samples)
+    logger.info(
+        {
+            "message": "Bulk sample creation finished",
+            "succeeded": data.succeeded,
+            "failed": data.failed,
+        }
+    )
+    return _respond(
+        Response[BulkResult[SamplePublic]],
+        Response(
+            status=status.HTTP_200_OK,
+            message="Bulk create processed",
+            data=data,
+        ),
+    )
+
+
+@SampleRouter.patch("/bulk")
+@tracer.observe()
+async def update_many(
+    logger: Logger,
+    sample_service: Annotated[SampleService, Depends()],
+    samples: list[SampleBulkUpdate],
+) -> Response[BulkResult[SamplePublic]]:
+    logger.info(
+        {
+            "message": "Updating samples in bulk",
+            "count": len(samples),
+        }
+    )
+    data = await sample_service.update_many(samples)
+    logger.info(
+        {
+            "message": "Bulk sample update finished",
+            "succeeded": data.succeeded,
+            "failed": data.failed,
+        }
+    )
+    return _respond(
+        Response[BulkResult[SamplePublic]],
+        Response(
+            status=status.HTTP_200_OK,
+            message="Bulk update processed",
+            data=data,
+        ),
+    )
+
+
+@SampleRouter.delete("/bulk")
+@tracer.observe()
+async def delete_many(
+    logger: Logger,
+    sample_service: Annotated[SampleService, Depends()],
+    ids: Annotated[list[UUID], Body()],
+) -> Response[BulkResult[SamplePublic]]:
+    logger.info(
+        {
+            "message": "Deleting samples in bulk",
+            "count": len(ids),
+        }
+    )
+    data = await sample_service.delete_many(ids)
     logger.info(
         {
-            "message": "Sample created successfully",
-            "sample": data.model_dump(mode="json"),
+            "message": "Bulk sample deletion finished",
+            "succeeded": data.succeeded,
+            "failed": data.failed,
         }
     )
-    return Response(
-        status=status.HTTP_200_OK,
-        message="Sample created successfully",
-        data=data,
+    return _respond(
+        Response[BulkResult[SamplePublic]],
+        Response(
+            status=status.HTTP_200_OK,
+            message="Bulk delete processed",
+            data=data,
+        ),
     )
 
 
@@ -50,10 +190,66 @@ async def create(
 async def read_all(
     logger: Logger,
     sample_service: Annotated[SampleService, Depends()],
+    conditional: Conditional,
+    response: HttpResponse,
 ) -> Page[SamplePublic]:
     logger.info({"message": "Reading all samples"})
     data = await sample_service.read_all()
-    return data
+    etag = make_etag(
+        data.total,
+        data.page,
+        data.size,
+        *((item.id, item.updated_at) for item in data.items),
+    )
+    if conditional.is_not_modified(etag):
+        return conditional.not_modified(etag)
+    conditional.apply(response, etag)
+    return _respond(Page[SamplePublic], data, response)
+
+
+@SampleRouter.get("/cursor")
+@tracer.observe()
+async def read_all_cursor(
+    logger: Logger,
+    sample_service: Annotated[SampleService, Depends()],
+    params: Annotated[CursorParams, Query()],
+    conditional: Conditional,
+    response: HttpResponse,
+) -> CursorPage[SamplePublic]:
+    logger.info({"message": "Reading samples by cursor"})
+    data = await sample_service.read_all_cursor(params)
+    etag = make_etag(
+        data.total,
+        data.next_cursor,
+        data.previous_cursor,
+        *((item.id, item.updated_at) for item in data.items),
+    )
+    if conditional.is_not_modified(etag):
+        return conditional.not_modified(etag)
+    conditional.apply(response, etag)
+    return _respond(CursorPage[SamplePublic], data, response)
+
+
+@SampleRouter.get("/export")
+@tracer.observe()
+async def export(
+    logger: Logger,
+    sample_service: Annotated[SampleService, Depends()],
+    format: ExportFormat = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    logger.info(
+        {
+            "message": "Exporting samples",
+            "format": format,
+        }
+    )
+    return StreamingResponse(
+        sample_service.export(format),
+        media_type=format.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="samples.{format}"'
+        },
+    )
 
 
 @SampleRouter.get("/{id}")
@@ -61,6 +257,8 @@ async def read_all(
 async def read(
     logger: Logger,
     sample_service: Annotated[SampleService, Depends()],
+    conditional: Conditional,
+    response: HttpResponse,
     id: UUID,
 ) -> Response[SamplePublic]:
     logger.info(
@@ -69,11 +267,24 @@ async def read(
             "sample_id": str(id),
         }
     )
+    if conditional.present:
+        # answer revalidation from `updated_at` alone, without the full row
+        updated_at = await sample_service.read_version(id)
+        etag = make_etag(id, updated_at)
+        if conditional.is_not_modified(etag, updated_at):
+            return conditional.not_modified(etag, updated_at)
     data = await sample_service.read(id)
-    return Response(
-        status=status.HTTP_200_OK,
-        message="Success",
-        data=data,
+    conditional.apply(
+        response, make_etag(data.id, data.updated_at), data.updated_at
+    )
+    return _respond(
+        Response[SamplePublic],
+        Response(
+            status=status.HTTP_200_OK,
+            message="Success",
+            data=data,
+        ),
+        response,
     )
 
 
@@ -86,23 +297,30 @@ async def update(
     sample: SampleUpdate,
 ) -> Response[SamplePublic]:
     logger.info(
-        {
-            "message": "Updating sample",
-            "sample_id": str(id),
-            "update_data": sample.model_dump(exclude_none=True),
-        }
+        Lazy(
+            lambda: {
+                "message": "Updating sample",
+                "sample_id": str(id),
+                "update_data": sample.model_dump(exclude_none=True),
+            }
+        )
     )
     data = await sample_service.update(id, sample)
     logger.info(
-        {
-            "message": "Sample updated successfully",
-            "sample": data.model_dump(mode="json"),
-        }
+        Lazy(
+            lambda: {
+                "message": "Sample updated successfully",
+                "sample": data.model_dump(mode="json"),
+            }
+        )
     )
-    return Response(
-        status=status.HTTP_200_OK,
-        message="Successfully updated",
-        data=data,
+    return _respond(
+        Response[SamplePublic],
+        Response(
+            status=status.HTTP_200_OK,
+            message="Successfully updated",
+            data=data,
+        ),
     )
 
 
@@ -126,8 +344,11 @@ async def delete(
             "sample_id": str(id),
         }
     )
-    return Response(
-        status=status.HTTP_200_OK,
-        message="Successfully deleted",
-        data=None,
+    return _respond(
+        Response,
+        Response(
+            status=status.HTTP_200_OK,
+            message="Successfully deleted",
+            data=None,
+        ),
     )
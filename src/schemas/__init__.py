@@ -1,3 +1,15 @@
+from .bulk_schema import BulkItem as BulkItem
+from .bulk_schema import BulkResult as BulkResult
+from .bulk_schema import BulkStatus as BulkStatus
+from .export_schema import ExportFormat as ExportFormat
+from .health_schema import CacheStatus as CacheStatus
+from .health_schema import DependencyStatus as DependencyStatus
 from .health_schema import HealthCheck as HealthCheck
+from .health_schema import PoolStatus as PoolStatus
+from .page_schema import Cursor as Cursor
+from .page_schema import CursorPage as CursorPage
+from .page_schema import CursorParams as CursorParams
 from .page_schema import Page as Page
+from .page_schema import TotalMode as TotalMode
+from .response_schema import FastJSONResponse as FastJSONResponse
 from .response_schema import Response as Response
@@ -0,0 +1,30 @@
+from enum import StrEnum, auto
+from typing import TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class BulkStatus(StrEnum):
+    CREATED = auto()
+    UPDATED = auto()
+    DELETED = auto()
+    CONFLICT = auto()
+    NOT_FOUND = auto()
+
+
+class BulkItem[T](BaseModel):
+    """Outcome of one item of a bulk request, in request order."""
+
+    index: int
+    id: UUID | None = None
+    status: BulkStatus
+    data: T | None = None
+
+
+class BulkResult[T](BaseModel):
+    items: list[BulkItem[T]]
+    succeeded: int = 0
+    failed: int = 0
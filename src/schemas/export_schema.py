@@ -0,0 +1,13 @@
+from enum import StrEnum, auto
+
+
+class ExportFormat(StrEnum):
+    NDJSON = auto()
+    CSV = auto()
+
+    @property
+    def media_type(self) -> str:
+        return {
+            ExportFormat.NDJSON: "application/x-ndjson",
+            ExportFormat.CSV: "text/csv",
+        }[self]
@@ -1,8 +1,46 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
+class PoolStatus(BaseModel):
+    """Connection pool saturation of the database engine."""
+
+    size: int = 0
+    checked_out: int = 0
+    overflow: int = 0
+    waiting: int = 0
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class CacheStatus(BaseModel):
+    """Hit, miss and eviction counters of the read-through cache."""
+
+    backend: str = "none"
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    stale_writes: int = 0
+    errors: int = 0
+
+
+class DependencyStatus(BaseModel):
+    """Result of the last background probe of one dependency."""
+
+    status: str = "OK"
+    latency_ms: float = 0.0
+    checked_at: datetime | None = None
+    error: str | None = None
+
+
 class HealthCheck(BaseModel):
     """Response model to validate and return when performing a health check."""
 
     status: str = "OK"
     version: str = ""
+    pool: PoolStatus | None = None
+    cache: CacheStatus | None = None
+    dependencies: dict[str, DependencyStatus] | None = None
@@ -1,8 +1,16 @@
-from typing import TypeVar
+import base64
+import binascii
+from datetime import datetime
+from enum import StrEnum, auto
+from typing import Self, TypeVar
+from uuid import UUID
 
 from fastapi import Query
 from fastapi_pagination import Page as BasePage
 from fastapi_pagination.customization import CustomizedPage, UseParamsFields
+from pydantic import BaseModel, Field, ValidationError
+
+from src.exceptions import InvalidCursorError
 
 T = TypeVar("T")
 
@@ -13,3 +21,46 @@ Page = CustomizedPage[
         size=Query(100, ge=1, le=500),
     ),
 ]
+
+
+class TotalMode(StrEnum):
+    NONE = auto()
+    EXACT = auto()
+    ESTIMATED = auto()
+
+
+class Cursor(BaseModel):
+    """Position of a row in the stable `(created_at, id)` ordering."""
+
+    created_at: datetime
+    id: UUID
+    backward: bool = False
+
+    def encode(self) -> str:
+        return (
+            base64.urlsafe_b64encode(self.model_dump_json().encode())
+            .rstrip(b"=")
+            .decode()
+        )
+
+    @classmethod
+    def decode(cls, value: str) -> Self:
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            return cls.model_validate_json(raw)
+        except (binascii.Error, ValueError, ValidationError) as error:
+            raise InvalidCursorError() from error
+
+
+class CursorParams(BaseModel):
+    cursor: str | None = None
+    size: int = Field(100, ge=1, le=500)
+    total: TotalMode = TotalMode.NONE
+
+
+class CursorPage[T](BaseModel):
+    items: list[T]
+    size: int
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    total: int | None = None
@@ -1,6 +1,10 @@
-from typing import TypeVar
+from collections.abc import Mapping
+from typing import Any, Self, TypeVar
 
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from pydantic_core import to_json
+from starlette.background import BackgroundTask
 
 T = TypeVar("T")
 
@@ -9,3 +13,31 @@ class Response[T](BaseModel):
     status: int = 200
     message: str = ""
     data: T | None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by pydantic-core's Rust encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+    @classmethod
+    def validated(
+        cls,
+        model: type[BaseModel],
+        content: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ) -> Self:
+        """Validate `content` (ORM objects included) once and render it.
+
+        Returning the result from a route bypasses FastAPI's own response
+        validation and `jsonable_encoder` pass.
+        """
+        return cls(
+            model.model_validate(content, from_attributes=True),
+            status_code=status_code,
+            headers=headers,
+            background=background,
+        )
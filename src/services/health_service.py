@@ -1,31 +1,67 @@
-from importlib import metadata
+from dataclasses import asdict
 from typing import Annotated
 
 from fastapi import Depends
 
-from src.dependencies import Config
+from src.dependencies import Cache, Config, database, health
 from src.repositories import HealthRepository
-from src.schemas import HealthCheck
+from src.schemas import CacheStatus, DependencyStatus, HealthCheck, PoolStatus
 
 
 class HealthService:
     config: Config
+    cache: Cache
     health_repository: HealthRepository
 
     def __init__(
         self,
         config: Config,
+        cache: Cache,
         health_repository: Annotated[HealthRepository, Depends()],
     ) -> None:
         self.config = config
+        self.cache = cache
         self.health_repository = health_repository
 
+    def _stats(self, health_check: HealthCheck) -> HealthCheck:
+        health_check.version = health.version()
+        health_check.pool = PoolStatus(**asdict(database.pool_stats()))
+        health_check.cache = CacheStatus(
+            backend=self.config.cache.backend, **asdict(self.cache.stats)
+        )
+        return health_check
+
     async def check(
         self,
     ) -> HealthCheck:
         health_check = HealthCheck()
         health_check.status = "HANANABUBU"
-        if await self.health_repository.check():
+        if (
+            await self.health_repository.check()
+            and await self.health_repository.check_cache()
+        ):
             health_check.status = "OK"
-        health_check.version = metadata.version(self.config.service)
-        return health_check
+        return self._stats(health_check)
+
+    async def ready(
+        self,
+    ) -> HealthCheck:
+        results = health.results()
+        health_check = HealthCheck(
+            dependencies={
+                name: DependencyStatus(
+                    status="OK" if result.healthy else "FAIL",
+                    latency_ms=result.latency_ms,
+                    checked_at=result.checked_at,
+                    error=result.error,
+                )
+                for name, result in results.items()
+            }
+        )
+        if (
+            not results
+            or health.stale()
+            or not all(result.healthy for result in results.values())
+        ):
+            health_check.status = "UNAVAILABLE"
+        return self._stats(health_check)
@@ -1,29 +1,86 @@
+import csv
+import io
+from collections.abc import AsyncIterator, Hashable, Sequence
+from contextlib import aclosing
+from datetime import datetime
 from typing import Annotated
 from uuid import UUID
 
 from fastapi import Depends
+from fastapi_pagination import resolve_params
+from pydantic_core import to_json
+from sqlalchemy import Row
 
-from src.dependencies import Logger, tracer
+from src.dependencies import Config, Lazy, Logger, SingleFlight, tracer
+from src.exceptions import BulkLimitExceededError
 from src.models import (
     Sample,
+    SampleBulkUpdate,
     SampleCreate,
     SampleUpdate,
 )
 from src.repositories import SampleRepository
-from src.schemas import Page
+from src.schemas import (
+    BulkItem,
+    BulkResult,
+    BulkStatus,
+    CursorPage,
+    CursorParams,
+    ExportFormat,
+    Page,
+)
 
 
 class SampleService:
+    config: Config
     sample_repository: SampleRepository
     logger: Logger
+    flight: SingleFlight
 
     def __init__(
         self,
+        config: Config,
         sample_repository: Annotated[SampleRepository, Depends()],
         logger: Logger,
+        flight: SingleFlight,
     ) -> None:
+        self.config = config
         self.sample_repository = sample_repository
         self.logger = logger
+        self.flight = flight
+
+    async def _coalesce(self, group: str, key: Hashable, call):
+        # a request that has written reads from the primary, so it must not
+        # share a result that may come from a replica
+        if self.sample_repository.pinned():
+            return await call()
+        return await self.flight.do(group, key, call)
+
+    def _forget(self, ids: Sequence[UUID] = ()) -> None:
+        # reads starting after this write must not join a flight started
+        # before it
+        for id in ids:
+            self.flight.forget("read", id)
+        self.flight.forget("read_all")
+
+    def _check_bulk_limit(self, count: int) -> None:
+        if count > self.config.bulk.max_items:
+            raise BulkLimitExceededError(self.config.bulk.max_items)
+
+    @staticmethod
+    def _bulk_result(
+        items: list[BulkItem[Sample]],
+    ) -> BulkResult[Sample]:
+        succeeded = sum(
+            item.status
+            in (BulkStatus.CREATED, BulkStatus.UPDATED, BulkStatus.DELETED)
+            for item in items
+        )
+        return BulkResult[Sample](
+            items=items,
+            succeeded=succeeded,
+            failed=len(items) - succeeded,
+        )
 
     @tracer.observe()
     async def create(
@@ -35,12 +92,15 @@ class SampleService:
         ) as span:
             try:
                 self.logger.info(
-                    {
-                        "message": "Starting sample creation logic",
-                        "sample": sample.model_dump(mode="json"),
-                    }
+                    Lazy(
+                        lambda: {
+                            "message": "Starting sample creation logic",
+                            "sample": sample.model_dump(mode="json"),
+                        }
+                    )
                 )
                 result = await self.sample_repository.create(sample)
+                self._forget()
                 span.set_attribute("sample.id", str(result.id))
                 return result
             except Exception as e:
@@ -53,6 +113,33 @@ class SampleService:
                 span.record_exception(e)
                 raise
 
+    @tracer.observe()
+    async def create_many(
+        self,
+        samples: list[SampleCreate],
+    ) -> BulkResult[Sample]:
+        self._check_bulk_limit(len(samples))
+        async with tracer.track(
+            "logic:create_samples", attributes={"samples.count": len(samples)}
+        ):
+            results = await self.sample_repository.create_many(samples)
+            self._forget()
+            return self._bulk_result(
+                [
+                    BulkItem[Sample](
+                        index=index,
+                        id=result.id,
+                        status=BulkStatus.CREATED,
+                        data=result,
+                    )
+                    if result is not None
+                    else BulkItem[Sample](
+                        index=index, status=BulkStatus.CONFLICT
+                    )
+                    for index, result in enumerate(results)
+                ]
+            )
+
     @tracer.observe()
     async def read_all(
         self,
@@ -61,10 +148,52 @@ class SampleService:
             self.logger.debug(
                 {"message": "Fetching all samples from repository"}
             )
-            result = await self.sample_repository.read_all()
+            # the page parameters are resolved from the request context
+            result = await self._coalesce(
+                "read_all",
+                resolve_params().model_dump_json(),
+                self.sample_repository.read_all,
+            )
+            span.set_attribute("samples.count", len(result.items))
+            return result
+
+    @tracer.observe()
+    async def read_all_cursor(
+        self,
+        params: CursorParams,
+    ) -> CursorPage[Sample]:
+        async with tracer.track("logic:read_all_samples_cursor") as span:
+            self.logger.debug(
+                {"message": "Fetching sample page by cursor from repository"}
+            )
+            result = await self.sample_repository.read_all_cursor(params)
             span.set_attribute("samples.count", len(result.items))
             return result
 
+    async def export(
+        self,
+        format: ExportFormat,
+    ) -> AsyncIterator[bytes]:
+        self.logger.debug(
+            {
+                "message": "Streaming samples export",
+                "format": format,
+            }
+        )
+        async with aclosing(self.sample_repository.stream()) as batches:
+            if format == ExportFormat.CSV:
+                yield b"id,name\r\n"
+            async for rows in batches:
+                yield self._encode(rows, format)
+
+    @staticmethod
+    def _encode(rows: Sequence[Row], format: ExportFormat) -> bytes:
+        if format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            return buffer.getvalue().encode()
+        return b"".join(to_json(row._asdict()) + b"\n" for row in rows)
+
     @tracer.observe()
     async def read(
         self,
@@ -76,7 +205,16 @@ class SampleService:
                 "sample_id": str(id),
             }
         )
-        return await self.sample_repository.read(id=id)
+        return await self._coalesce(
+            "read", id, lambda: self.sample_repository.read(id=id)
+        )
+
+    @tracer.observe()
+    async def read_version(
+        self,
+        id: UUID,
+    ) -> datetime:
+        return await self.sample_repository.read_version(id=id)
 
     @tracer.observe()
     async def update(
@@ -85,15 +223,72 @@ class SampleService:
         sample: SampleUpdate,
     ) -> Sample:
         self.logger.debug(
-            {
-                "message": "Calling repository to update sample",
-                "sample_id": str(id),
-                "update_data": sample.model_dump(
-                    mode="json", exclude_none=True
-                ),
-            }
+            Lazy(
+                lambda: {
+                    "message": "Calling repository to update sample",
+                    "sample_id": str(id),
+                    "update_data": sample.model_dump(
+                        mode="json", exclude_none=True
+                    ),
+                }
+            )
         )
-        return await self.sample_repository.update(id, sample)
+        result = await self.sample_repository.update(id, sample)
+        self._forget([id])
+        return result
+
+    @tracer.observe()
+    async def update_many(
+        self,
+        samples: list[SampleBulkUpdate],
+    ) -> BulkResult[Sample]:
+        self._check_bulk_limit(len(samples))
+        async with tracer.track(
+            "logic:update_samples", attributes={"samples.count": len(samples)}
+        ):
+            results = await self.sample_repository.update_many(samples)
+            self._forget([sample.id for sample in samples])
+            return self._bulk_result(
+                [
+                    BulkItem[Sample](
+                        index=index,
+                        id=sample.id,
+                        status=BulkStatus.UPDATED
+                        if result is not None
+                        else BulkStatus.NOT_FOUND,
+                        data=result,
+                    )
+                    for index, (sample, result) in enumerate(
+                        zip(samples, results, strict=True)
+                    )
+                ]
+            )
+
+    @tracer.observe()
+    async def delete_many(
+        self,
+        ids: list[UUID],
+    ) -> BulkResult[Sample]:
+        self._check_bulk_limit(len(ids))
+        async with tracer.track(
+            "logic:delete_samples", attributes={"samples.count": len(ids)}
+        ):
+            results = await self.sample_repository.delete_many(ids)
+            self._forget(ids)
+            return self._bulk_result(
+                [
+                    BulkItem[Sample](
+                        index=index,
+                        id=id,
+                        status=BulkStatus.DELETED
+                        if deleted
+                        else BulkStatus.NOT_FOUND,
+                    )
+                    for index, (id, deleted) in enumerate(
+                        zip(ids, results, strict=True)
+                    )
+                ]
+            )
 
     @tracer.observe()
     async def delete(
@@ -106,4 +301,5 @@ class SampleService:
                 "sample_id": str(id),
             }
         )
-        return await self.sample_repository.delete(id=id)
+        await self.sample_repository.delete(id=id)
+        self._forget([id])
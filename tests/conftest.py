@@ -0,0 +1,5 @@
+import os
+
+# settings are read when `src` is first imported
+os.environ.setdefault("SERVICE", "test")
+os.environ.setdefault("OBSERVABILITY__EXPORTER", "none")
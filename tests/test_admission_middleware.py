@@ -0,0 +1,245 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse
+from starlette.types import Message, Receive, Scope, Send
+
+from src.dependencies import config
+from src.middlewares import admission_middleware
+from src.middlewares.admission_middleware import (
+    AdaptiveLimit,
+    AdmissionMiddleware,
+)
+
+FAST = 0.01
+SLOW = 0.3
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(
+        admission_middleware,
+        "time",
+        SimpleNamespace(
+            monotonic=lambda: clock.now, perf_counter=lambda: clock.now
+        ),
+    )
+    return clock
+
+
+def adaptive(**overrides) -> AdaptiveLimit:
+    return AdaptiveLimit("write", config.RouteClass(**overrides))
+
+
+async def fill(limit: AdaptiveLimit) -> None:
+    for _ in range(int(limit.limit)):
+        assert await limit.acquire()
+
+
+async def test_admits_under_the_limit():
+    limit = adaptive(initial_limit=2)
+    assert await limit.acquire()
+    assert await limit.acquire()
+    assert limit.in_flight == 2
+    limit.release(FAST)
+    assert limit.in_flight == 1
+
+
+async def test_queues_over_the_limit():
+    limit = adaptive(initial_limit=1)
+    await fill(limit)
+    queued = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+    assert not queued.done()
+    limit.release(FAST)
+    assert await queued
+    assert limit.in_flight == 1
+
+
+async def test_sheds_when_the_estimated_wait_is_too_long():
+    limit = adaptive(initial_limit=1, max_wait=0.5)
+    await fill(limit)
+    limit.latency = 1.0
+    assert limit.estimated_wait() == 1.0
+    assert not await limit.acquire()
+    assert not limit._waiters
+
+
+async def test_gives_up_after_max_wait():
+    limit = adaptive(initial_limit=1, max_wait=0.05)
+    await fill(limit)
+    async with asyncio.timeout(1):
+        assert not await limit.acquire()
+    assert not limit._waiters
+    assert limit.in_flight == 1
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    limit = adaptive(initial_limit=1)
+    await fill(limit)
+    cancelled = asyncio.create_task(limit.acquire())
+    kept = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    assert len(limit._waiters) == 1
+    limit.release(FAST)
+    assert await kept
+    assert cancelled.cancelled()
+    assert limit.in_flight == 1
+
+
+async def test_cancelled_waiter_hands_its_slot_on():
+    limit = adaptive(initial_limit=1)
+    await fill(limit)
+    cancelled = asyncio.create_task(limit.acquire())
+    kept = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+    # the slot goes to the first waiter, which is cancelled before it runs
+    limit.release(FAST)
+    cancelled.cancel()
+    async with asyncio.timeout(1):
+        assert await kept
+    assert cancelled.cancelled()
+    assert limit.in_flight == 1
+
+
+async def test_unsaturated_completions_leave_the_limit(clock: SimpleNamespace):
+    limit = adaptive(initial_limit=10)
+    # sequential requests, however slow, never contend for the limit
+    for latency in [FAST] * 10 + [SLOW] * 40:
+        assert await limit.acquire()
+        clock.now += latency
+        limit.release(latency)
+    assert limit.limit == 10
+    assert limit.no_load_latency > FAST
+
+
+async def test_saturated_fast_completions_raise_the_limit():
+    limit = adaptive(initial_limit=4)
+    assert await limit.acquire()
+    limit.release(FAST)
+    await fill(limit)
+    limit.release(FAST)
+    assert limit.limit == 4.25
+
+
+async def test_saturated_slow_completions_lower_the_limit(
+    clock: SimpleNamespace,
+):
+    limit = adaptive(initial_limit=10, backoff=0.5, min_limit=4)
+    assert await limit.acquire()
+    limit.release(FAST)
+    await fill(limit)
+    limit.release(SLOW)
+    assert limit.limit == 5
+    # the same burst of slow requests counts once
+    limit.release(SLOW)
+    assert limit.limit == 5
+    # still over the lowered limit a moment later
+    clock.now += 1.0
+    limit.release(SLOW)
+    assert limit.limit == 4
+
+
+class App:
+    """Answers `/samples` once `release` is set, other paths at once."""
+
+    def __init__(self) -> None:
+        self.entered = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["path"] == "/samples":
+            self.entered.set()
+            await self.release.wait()
+        await PlainTextResponse("ok")(scope, receive, send)
+
+
+async def request(
+    app: AdmissionMiddleware, method: str = "POST", path: str = "/samples"
+) -> list[Message]:
+    scope = {"type": "http", "method": method, "path": path, "headers": []}
+    sent: list[Message] = []
+
+    async def receive() -> Message:
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+@pytest.fixture
+def app() -> App:
+    return App()
+
+
+@pytest.fixture
+def middleware(app: App) -> AdmissionMiddleware:
+    return AdmissionMiddleware(
+        app,
+        settings=config.Admission(
+            enabled=True,
+            read=config.RouteClass(initial_limit=1),
+            write=config.RouteClass(initial_limit=1, max_wait=0.5),
+        ),
+    )
+
+
+async def hold(
+    app: App, middleware: AdmissionMiddleware, method: str = "POST"
+) -> asyncio.Task:
+    """A request that is admitted and then held inside the app."""
+    held = asyncio.create_task(request(middleware, method))
+    async with asyncio.timeout(1):
+        await app.entered.wait()
+    return held
+
+
+async def test_sheds_with_503_and_retry_after(
+    app: App, middleware: AdmissionMiddleware
+):
+    held = await hold(app, middleware)
+    middleware.limits["write"].latency = 1.5
+    start, body = await request(middleware)
+    assert start["status"] == 503
+    assert Headers(raw=start["headers"])["retry-after"] == "2"
+    assert json.loads(body["body"])["message"] == "Service Overloaded"
+    app.release.set()
+    assert (await held)[0]["status"] == 200
+    assert middleware.limits["write"].in_flight == 0
+
+
+async def test_classes_are_limited_separately(
+    app: App, middleware: AdmissionMiddleware
+):
+    held = await hold(app, middleware)
+    middleware.limits["write"].latency = 1.5
+    assert (await request(middleware))[0]["status"] == 503
+    # a read is admitted while writes are full
+    assert (await request(middleware, "GET", "/samples/1"))[0]["status"] == 200
+    app.release.set()
+    await held
+
+
+@pytest.mark.parametrize("path", ["/health", "/samples/export"])
+async def test_exempt_paths_are_never_limited(
+    app: App, middleware: AdmissionMiddleware, path: str
+):
+    held = await hold(app, middleware, "GET")
+    middleware.limits["read"].latency = 1.5
+    assert (await request(middleware, "GET"))[0]["status"] == 503
+    assert (await request(middleware, "GET", path))[0]["status"] == 200
+    app.release.set()
+    await held
+
+
+def test_disabled_by_default():
+    assert not config.Admission().enabled
@@ -0,0 +1,233 @@
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.dependencies import cache, to_utc
+from src.dependencies.cache import MemoryCache, RedisCache
+from src.repositories.sample_repository import SampleRepository
+
+UPDATED_AT = datetime(2025, 1, 1, 12, 0, 0, 123456)
+V1 = SampleRepository._version(UPDATED_AT)
+V2 = SampleRepository._version(UPDATED_AT + timedelta(microseconds=1))
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        cache, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    return clock
+
+
+@pytest.fixture
+def memory(clock: SimpleNamespace) -> MemoryCache:
+    return MemoryCache(ttl=10.0, max_entries=2)
+
+
+async def test_memory_hit_and_miss(memory: MemoryCache):
+    assert await memory.get("a") is None
+    assert await memory.set("a", b"1", V1)
+    assert await memory.get("a") == b"1"
+    assert (memory.stats.hits, memory.stats.misses) == (1, 1)
+
+
+async def test_memory_ttl(memory: MemoryCache, clock: SimpleNamespace):
+    await memory.set("a", b"1", V1)
+    clock.now += 9.9
+    assert await memory.get("a") == b"1"
+    clock.now += 0.1
+    assert await memory.get("a") is None
+
+
+async def test_memory_lru_eviction(memory: MemoryCache):
+    await memory.set("a", b"1", V1)
+    await memory.set("b", b"2", V1)
+    # reading "a" makes "b" the least recently used entry
+    assert await memory.get("a") == b"1"
+    await memory.set("c", b"3", V1)
+    assert await memory.get("b") is None
+    assert await memory.get("a") == b"1"
+    assert await memory.get("c") == b"3"
+    assert memory.stats.evictions == 1
+
+
+async def test_memory_rejects_older_version(memory: MemoryCache):
+    assert await memory.set("a", b"new", V2)
+    assert not await memory.set("a", b"old", V1)
+    assert await memory.get("a") == b"new"
+    assert memory.stats.stale_writes == 1
+
+
+async def test_memory_tombstone_rejects_stale_read(memory: MemoryCache):
+    await memory.set("a", b"old", V1)
+    await memory.invalidate("a", V2)
+    assert await memory.get("a") is None
+    # a reader that fetched the row before the update
+    assert not await memory.set("a", b"old", V1)
+    # one that fetched it after
+    assert await memory.set("a", b"new", V2)
+    assert await memory.get("a") == b"new"
+
+
+async def test_memory_tombstone_keeps_newest_version(memory: MemoryCache):
+    await memory.set("a", b"new", V2)
+    await memory.invalidate("a", V1)
+    assert not await memory.set("a", b"old", V1)
+    assert await memory.set("a", b"new", V2)
+
+
+async def test_memory_delete_tombstone_rejects_last_version(
+    memory: MemoryCache,
+):
+    await memory.set("a", b"row", V1)
+    await memory.invalidate(
+        "a", SampleRepository._version(UPDATED_AT, deleted=True)
+    )
+    # a reader that fetched the row just before it was deleted
+    assert not await memory.set("a", b"row", V1)
+    assert await memory.get("a") is None
+
+
+def test_version_reads_naive_timestamps_as_local_time():
+    aware = UPDATED_AT.astimezone()
+    assert V1 == aware.timestamp()
+    assert SampleRepository._version(aware.astimezone(UTC)) == V1
+    assert to_utc(UPDATED_AT) == aware
+    assert V1 < SampleRepository._version(UPDATED_AT, deleted=True) < V2
+
+
+def _encode(value) -> bytes:
+    # redis-py sends every argument as bytes
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    return repr(value).encode()
+
+
+class FakeRedis:
+    """The part of `redis.asyncio.Redis` that `RedisCache` uses.
+
+    The Lua scripts run as their Python equivalent; expiry is not modelled.
+    """
+
+    def __init__(self) -> None:
+        self.hashes: dict[bytes, dict[bytes, bytes]] = {}
+        self.ttls: dict[bytes, int] = {}
+        self.closed = False
+
+    def register_script(self, script: str):
+        run = {
+            cache._SET_SCRIPT: self._set,
+            cache._INVALIDATE_SCRIPT: self._invalidate,
+        }[script]
+
+        async def call(keys, args):
+            return run(_encode(keys[0]), [_encode(arg) for arg in args])
+
+        return call
+
+    def _set(self, key: bytes, args: list[bytes]) -> int:
+        version, value, ttl = args
+        current = self.hashes.get(key, {}).get(b"v")
+        if current and float(current) > float(version):
+            return 0
+        self.hashes[key] = {b"v": version, b"d": value}
+        self.ttls[key] = int(ttl)
+        return 1
+
+    def _invalidate(self, key: bytes, args: list[bytes]) -> int:
+        version, ttl = args
+        current = self.hashes.get(key, {}).get(b"v")
+        if current and float(current) > float(version):
+            version = current
+        self.hashes[key] = {b"v": version, b"d": b""}
+        self.ttls[key] = int(ttl)
+        return 1
+
+    async def hget(self, key: str, field: str) -> bytes | None:
+        return self.hashes.get(_encode(key), {}).get(_encode(field))
+
+    async def ping(self) -> bool:
+        return True
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class BrokenRedis(FakeRedis):
+    def register_script(self, script: str):
+        async def call(keys, args):
+            raise ConnectionError("connection refused")
+
+        return call
+
+    async def hget(self, key: str, field: str) -> bytes | None:
+        raise ConnectionError("connection refused")
+
+
+@pytest.fixture
+def client() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def redis(client: FakeRedis) -> RedisCache:
+    return RedisCache(client, ttl=10.0, prefix="test:")
+
+
+async def test_redis_hit_and_miss(redis: RedisCache, client: FakeRedis):
+    assert await redis.get("a") is None
+    assert await redis.set("a", b"1", V1)
+    assert await redis.get("a") == b"1"
+    assert client.ttls[b"test:a"] == 10_000
+    assert (redis.stats.hits, redis.stats.misses) == (1, 1)
+
+
+async def test_redis_rejects_older_version(redis: RedisCache):
+    assert await redis.set("a", b"new", V2)
+    assert not await redis.set("a", b"old", V1)
+    assert await redis.get("a") == b"new"
+    assert redis.stats.stale_writes == 1
+
+
+async def test_redis_tombstone_rejects_stale_read(redis: RedisCache):
+    await redis.set("a", b"old", V1)
+    await redis.invalidate("a", V2)
+    assert await redis.get("a") is None
+    assert not await redis.set("a", b"old", V1)
+    assert await redis.set("a", b"new", V2)
+    assert await redis.get("a") == b"new"
+
+
+async def test_redis_tombstone_keeps_newest_version(redis: RedisCache):
+    await redis.set("a", b"new", V2)
+    await redis.invalidate("a", V1)
+    assert not await redis.set("a", b"old", V1)
+
+
+async def test_redis_delete_tombstone_rejects_last_version(
+    redis: RedisCache,
+):
+    await redis.set("a", b"row", V1)
+    await redis.invalidate(
+        "a", SampleRepository._version(UPDATED_AT, deleted=True)
+    )
+    assert not await redis.set("a", b"row", V1)
+    assert await redis.get("a") is None
+
+
+async def test_redis_errors_degrade_to_misses():
+    redis = RedisCache(BrokenRedis(), ttl=10.0)
+    assert await redis.get("a") is None
+    assert not await redis.set("a", b"1", V1)
+    await redis.invalidate("a", V1)
+    assert redis.stats.errors == 3
+
+
+async def test_redis_close(redis: RedisCache, client: FakeRedis):
+    await redis.ping()
+    await redis.close()
+    assert client.closed
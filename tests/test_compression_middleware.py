@@ -0,0 +1,189 @@
+import gzip
+import sys
+import zlib
+
+import pytest
+from starlette.datastructures import Headers
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Message, Receive, Scope, Send
+
+from src.dependencies import config
+from src.dependencies.config import Encoding
+from src.middlewares import CompressionMiddleware
+from src.middlewares.compression_middleware import negotiate
+
+BODY = b'{"name": "sample"}\n' * 200
+ALL = (Encoding.ZSTD, Encoding.BR, Encoding.GZIP)
+
+
+def decoder(encoding: str):
+    """Incremental decompression: each call returns what it can decode.
+
+    br and zstd need the `compression` extra; tests using them skip without.
+    """
+    match encoding:
+        case Encoding.GZIP:
+            return zlib.decompressobj(zlib.MAX_WBITS | 16).decompress
+        case Encoding.BR:
+            brotli = pytest.importorskip("brotli")
+            return brotli.Decompressor().process
+        case Encoding.ZSTD:
+            zstandard = pytest.importorskip("zstandard")
+            return zstandard.ZstdDecompressor().decompressobj().decompress
+
+
+def encoding_of(package: str) -> str:
+    return {"brotli": Encoding.BR, "zstandard": Encoding.ZSTD}[package]
+
+
+def middleware(app, **overrides) -> CompressionMiddleware:
+    return CompressionMiddleware(app, settings=config.Compression(**overrides))
+
+
+async def call(
+    app: CompressionMiddleware, accept_encoding: str | None = "gzip"
+) -> list[Message]:
+    headers = []
+    if accept_encoding is not None:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    sent: list[Message] = []
+
+    async def receive() -> Message:
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+def respond(response: Response):
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await response(scope, receive, send)
+
+    return app
+
+
+def json_body(body: bytes = BODY, **kwargs) -> Response:
+    return Response(body, media_type="application/json", **kwargs)
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip", "gzip"),
+        ("gzip, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0.5, gzip;q=0.5", "br"),
+        ("GZIP", "gzip"),
+        ("*", "zstd"),
+        ("*;q=0.5, zstd;q=0", "br"),
+        ("gzip;q=0", None),
+        ("gzip;q=bad", None),
+        # identity is refused, gzip is the only other encoding listed
+        ("gzip;q=0.5, identity;q=0", "gzip"),
+        # nothing acceptable is listed, so the body goes out unencoded
+        ("identity;q=0", None),
+        ("deflate", None),
+    ],
+)
+def test_negotiate(accept_encoding: str, expected: str | None):
+    assert negotiate(accept_encoding, ALL) == expected
+
+
+async def test_compresses_with_negotiated_encoding():
+    decode = decoder(Encoding.BR)
+    messages = await call(middleware(respond(json_body())), "gzip, br")
+    headers = Headers(raw=messages[0]["headers"])
+    assert headers["content-encoding"] == "br"
+    assert headers["vary"] == "Accept-Encoding"
+    body = messages[1]["body"]
+    assert int(headers["content-length"]) == len(body)
+    assert decode(body) == BODY
+
+
+@pytest.mark.parametrize("package", ["brotli", "zstandard"])
+async def test_missing_package_falls_back_to_gzip(
+    monkeypatch: pytest.MonkeyPatch, package: str
+):
+    # importing a module set to None raises ImportError
+    monkeypatch.setitem(sys.modules, package, None)
+    app = middleware(respond(json_body()))
+    assert encoding_of(package) not in app.available
+    assert app.available[-1] == Encoding.GZIP
+    messages = await call(app, f"{encoding_of(package)}, gzip;q=0.5")
+    headers = Headers(raw=messages[0]["headers"])
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(messages[1]["body"]) == BODY
+
+
+async def test_no_accept_encoding_passes_through():
+    messages = await call(middleware(respond(json_body())), None)
+    assert "content-encoding" not in Headers(raw=messages[0]["headers"])
+    assert messages[1]["body"] == BODY
+
+
+@pytest.mark.parametrize("status", [204, 206, 304])
+async def test_statuses_without_a_full_body_pass_through(status: int):
+    body = b"" if status != 206 else BODY
+    messages = await call(
+        middleware(respond(json_body(body, status_code=status)))
+    )
+    assert "content-encoding" not in Headers(raw=messages[0]["headers"])
+    assert messages[1]["body"] == body
+
+
+async def test_encoded_response_passes_through():
+    encoded = gzip.compress(BODY)
+    response = json_body(encoded, headers={"Content-Encoding": "gzip"})
+    messages = await call(middleware(respond(response)), "br")
+    headers = Headers(raw=messages[0]["headers"])
+    assert headers["content-encoding"] == "gzip"
+    assert messages[1]["body"] == encoded
+
+
+async def test_binary_media_type_passes_through():
+    response = Response(BODY, media_type="image/png")
+    messages = await call(middleware(respond(response)))
+    assert "content-encoding" not in Headers(raw=messages[0]["headers"])
+
+
+async def test_minimum_size():
+    app = middleware(respond(json_body(BODY[:99])), minimum_size=100)
+    messages = await call(app)
+    headers = Headers(raw=messages[0]["headers"])
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert messages[1]["body"] == BODY[:99]
+
+    app = middleware(respond(json_body(BODY[:100])), minimum_size=100)
+    messages = await call(app)
+    assert Headers(raw=messages[0]["headers"])["content-encoding"] == "gzip"
+
+
+@pytest.mark.parametrize("encoding", ALL)
+async def test_streamed_chunks_are_flushed(encoding: str):
+    decode = decoder(encoding)
+    # like `/samples/export` in ndjson
+    chunks = [b'{"id": %d}\n' % i * 50 for i in range(3)]
+
+    async def rows():
+        for chunk in chunks:
+            yield chunk
+
+    response = StreamingResponse(rows(), media_type="application/x-ndjson")
+    messages = await call(middleware(respond(response)), encoding)
+    headers = Headers(raw=messages[0]["headers"])
+    assert headers["content-encoding"] == encoding
+    assert "content-length" not in headers
+
+    # one message per chunk, then the end of the stream
+    bodies = [message["body"] for message in messages[1:]]
+    assert len(bodies) == len(chunks) + 1
+    # each chunk decodes on arrival, without waiting for the next one
+    for body, chunk in zip(bodies, chunks, strict=False):
+        assert decode(body) == chunk
+    assert decode(bodies[-1]) == b""
+    assert not messages[-1].get("more_body", False)
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+from uuid import uuid4
+
+import pytest
+
+from src.dependencies import config, database
+from src.dependencies.cache import NullCache
+from src.dependencies.group_commit import GroupCommitBatcher
+from src.exceptions import SampleAlreadyExistsError
+from src.models import Sample, SampleCreate
+from src.repositories.sample_repository import SampleRepository
+
+
+class Recorder:
+    """A flush that records its batches and answers `item * 10`."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[int]] = []
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, items: list[int]) -> list[int]:
+        self.batches.append(list(items))
+        self.started.set()
+        await self.release.wait()
+        return [item * 10 for item in items]
+
+
+async def test_flushes_when_window_ends():
+    batcher = GroupCommitBatcher(enabled=True, window=0.01, max_size=100)
+    flush = Recorder()
+    results = await asyncio.gather(
+        *(batcher.submit("create", item, flush) for item in (1, 2, 3))
+    )
+    assert results == [10, 20, 30]
+    assert flush.batches == [[1, 2, 3]]
+
+
+async def test_flushes_when_batch_is_full():
+    batcher = GroupCommitBatcher(enabled=True, window=60.0, max_size=2)
+    flush = Recorder()
+    async with asyncio.timeout(1):
+        results = await asyncio.gather(
+            batcher.submit("create", 1, flush),
+            batcher.submit("create", 2, flush),
+        )
+    assert results == [10, 20]
+    # the next item opens a new batch
+    third = asyncio.create_task(batcher.submit("create", 3, flush))
+    await asyncio.sleep(0)
+    assert flush.batches == [[1, 2]]
+    await batcher.drain()
+    assert await third == 30
+    assert flush.batches == [[1, 2], [3]]
+
+
+async def test_groups_are_batched_separately():
+    batcher = GroupCommitBatcher(enabled=True, window=0.01, max_size=100)
+    creates, updates = Recorder(), Recorder()
+    results = await asyncio.gather(
+        batcher.submit("create", 1, creates),
+        batcher.submit("update", 2, updates),
+        batcher.submit("create", 3, creates),
+    )
+    assert results == [10, 20, 30]
+    assert creates.batches == [[1, 3]]
+    assert updates.batches == [[2]]
+
+
+async def test_each_caller_gets_its_own_result():
+    batcher = GroupCommitBatcher(enabled=True, window=0.01, max_size=100)
+    flush = Recorder()
+    tasks = {
+        item: asyncio.create_task(batcher.submit("create", item, flush))
+        for item in (5, 3, 9, 1)
+    }
+    for item, task in tasks.items():
+        assert await task == item * 10
+    assert flush.batches == [[5, 3, 9, 1]]
+
+
+async def test_flush_error_reaches_every_caller():
+    batcher = GroupCommitBatcher(enabled=True, window=0.01, max_size=100)
+
+    async def flush(items: list[int]) -> list[int]:
+        raise RuntimeError("connection lost")
+
+    results = await asyncio.gather(
+        batcher.submit("create", 1, flush),
+        batcher.submit("create", 2, flush),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_cancelled_before_flush_is_dropped():
+    batcher = GroupCommitBatcher(enabled=True, window=0.05, max_size=100)
+    flush = Recorder()
+    cancelled = asyncio.create_task(batcher.submit("create", 1, flush))
+    kept = asyncio.create_task(batcher.submit("create", 2, flush))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    assert await kept == 20
+    assert cancelled.cancelled()
+    assert flush.batches == [[2]]
+
+
+async def test_cancelled_after_flush_is_written_anyway():
+    batcher = GroupCommitBatcher(enabled=True, window=0.01, max_size=100)
+    flush = Recorder()
+    flush.release.clear()
+    cancelled = asyncio.create_task(batcher.submit("create", 1, flush))
+    kept = asyncio.create_task(batcher.submit("create", 2, flush))
+    async with asyncio.timeout(1):
+        await flush.started.wait()
+    cancelled.cancel()
+    flush.release.set()
+    assert await kept == 20
+    assert cancelled.cancelled()
+    assert flush.batches == [[1, 2]]
+
+
+async def test_drain_flushes_open_batches():
+    batcher = GroupCommitBatcher(enabled=True, window=60.0, max_size=100)
+    flush = Recorder()
+    tasks = [
+        asyncio.create_task(batcher.submit("create", item, flush))
+        for item in (1, 2)
+    ]
+    await asyncio.sleep(0)
+    async with asyncio.timeout(1):
+        await batcher.drain()
+    assert flush.batches == [[1, 2]]
+    assert [task.result() for task in tasks] == [10, 20]
+    assert not batcher._batches and not batcher._flushing
+
+
+class FakeSession:
+    """Inserts like `ON CONFLICT DO NOTHING ... RETURNING`."""
+
+    def __init__(self, table: dict) -> None:
+        self.table = table
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def scalars(self, statement, rows: list[dict]) -> list[Sample]:
+        inserted = []
+        for row in rows:
+            if row["id"] not in self.table:
+                self.table[row["id"]] = row
+                inserted.append(Sample(**row))
+        return inserted
+
+    async def commit(self) -> None:
+        return None
+
+
+@pytest.fixture
+def table(monkeypatch: pytest.MonkeyPatch) -> dict:
+    table: dict = {}
+    monkeypatch.setattr(
+        database, "get_session_factory", lambda: lambda: FakeSession(table)
+    )
+    return table
+
+
+@pytest.fixture
+def repository(table: dict) -> SampleRepository:
+    return SampleRepository(
+        config=config.get_config(),
+        db=None,
+        cache=NullCache(),
+        logger=logging.getLogger("test"),
+        group_commit=GroupCommitBatcher(
+            enabled=True, window=0.01, max_size=100
+        ),
+    )
+
+
+async def test_batch_marks_duplicate_ids(table: dict):
+    sample = Sample(id=uuid4(), name="first")
+    duplicate = Sample(id=sample.id, name="second")
+    other = Sample(id=uuid4(), name="other")
+    results = await SampleRepository._create_batch([sample, duplicate, other])
+    assert [result and result.name for result in results] == [
+        "first",
+        None,
+        "other",
+    ]
+
+
+async def test_create_batches_concurrent_callers(
+    repository: SampleRepository, table: dict
+):
+    results = await asyncio.gather(
+        *(repository.create(SampleCreate(name=f"s{i}")) for i in range(3))
+    )
+    assert [result.name for result in results] == ["s0", "s1", "s2"]
+    assert len(table) == 3
+
+
+async def test_create_conflict_raises_already_exists(
+    repository: SampleRepository, monkeypatch: pytest.MonkeyPatch
+):
+    async def create_batch(samples: list[Sample]) -> list[Sample | None]:
+        return [
+            None if sample.name == "taken" else sample for sample in samples
+        ]
+
+    monkeypatch.setattr(
+        SampleRepository, "_create_batch", staticmethod(create_batch)
+    )
+    results = await asyncio.gather(
+        repository.create(SampleCreate(name="taken")),
+        repository.create(SampleCreate(name="fresh")),
+        return_exceptions=True,
+    )
+    assert isinstance(results[0], SampleAlreadyExistsError)
+    assert results[1].name == "fresh"
@@ -0,0 +1,20 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.routers import HealthRouter
+
+
+def test_livez_has_no_dependencies():
+    route = next(
+        route for route in HealthRouter.routes if route.path == "/livez"
+    )
+    assert route.dependant.dependencies == []
+
+
+def test_livez():
+    app = FastAPI()
+    app.include_router(HealthRouter)
+    with TestClient(app) as client:
+        response = client.get("/livez")
+    assert response.status_code == 200
+    assert response.json()["status"] == "OK"
@@ -0,0 +1,185 @@
+import asyncio
+import socket
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.dependencies import config, http_client
+from src.dependencies.http_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientTransport,
+)
+
+
+@dataclass
+class Upstream:
+    url: str
+    hits: Counter[str] = field(default_factory=Counter)
+
+
+def stub(hits: Counter[str]) -> Starlette:
+    async def ok(request: Request):
+        return PlainTextResponse("ok")
+
+    async def slow(request: Request):
+        await asyncio.sleep(1.0)
+        return PlainTextResponse("slow")
+
+    async def flaky(request: Request):
+        key = request.path_params["key"]
+        hits[key] += 1
+        status = 503 if hits[key] <= 2 else 200
+        return PlainTextResponse("flaky", status_code=status)
+
+    async def down(request: Request):
+        hits["down"] += 1
+        return PlainTextResponse("down", status_code=500)
+
+    return Starlette(
+        routes=[
+            Route("/ok", ok),
+            Route("/slow", slow),
+            Route("/flaky/{key}", flaky, methods=["GET", "POST"]),
+            Route("/down", down),
+        ]
+    )
+
+
+class StubServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config) -> None:
+        super().__init__(config)
+        self.ready = asyncio.Event()
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        self.ready.set()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+async def upstream() -> AsyncIterator[Upstream]:
+    port = free_port()
+    upstream = Upstream(url=f"http://127.0.0.1:{port}")
+    server = StubServer(
+        uvicorn.Config(
+            stub(upstream.hits),
+            port=port,
+            log_level="warning",
+            lifespan="off",
+            ws="none",
+        )
+    )
+    serving = asyncio.create_task(server.serve())
+    async with asyncio.timeout(5):
+        await server.ready.wait()
+    yield upstream
+    server.should_exit = True
+    await serving
+
+
+def client(**overrides) -> httpx.AsyncClient:
+    settings = config.HttpClient(
+        retry_backoff=0.01, breaker_reset=0.2, **overrides
+    )
+    return httpx.AsyncClient(transport=ResilientTransport(settings))
+
+
+async def test_idempotent_request_retried(upstream: Upstream):
+    async with client(retries=2) as resilient:
+        response = await resilient.get(f"{upstream.url}/flaky/get")
+    assert response.status_code == 200
+    assert upstream.hits["get"] == 3
+
+
+async def test_post_not_retried(upstream: Upstream):
+    async with client(retries=2) as resilient:
+        response = await resilient.post(f"{upstream.url}/flaky/post")
+    assert response.status_code == 503
+    assert upstream.hits["post"] == 1
+
+
+async def test_circuit_opens_after_consecutive_failures(upstream: Upstream):
+    async with client(retries=0, breaker_failures=3) as resilient:
+        for _ in range(3):
+            await resilient.get(f"{upstream.url}/down")
+        with pytest.raises(CircuitOpenError) as raised:
+            await resilient.get(f"{upstream.url}/down")
+    assert isinstance(raised.value, httpx.TransportError)
+    assert raised.value.host == upstream.url
+    assert upstream.hits["down"] == 3
+
+
+async def test_trial_request_after_reset(upstream: Upstream):
+    async with client(retries=0, breaker_failures=3) as resilient:
+        for _ in range(3):
+            await resilient.get(f"{upstream.url}/down")
+        await asyncio.sleep(0.3)
+        response = await resilient.get(f"{upstream.url}/ok")
+        assert response.status_code == 200
+        # the successful trial closed the circuit
+        response = await resilient.get(f"{upstream.url}/ok")
+        assert response.status_code == 200
+
+
+async def test_saturated_host_does_not_delay_another(upstream: Upstream):
+    async with client(retries=0, max_connections=2) as resilient:
+        saturating = [
+            asyncio.create_task(resilient.get(f"{upstream.url}/slow"))
+            for _ in range(10)
+        ]
+        await asyncio.sleep(0.1)
+        # pooled separately from 127.0.0.1
+        other = upstream.url.replace("127.0.0.1", "localhost")
+        start = time.perf_counter()
+        response = await resilient.get(f"{other}/ok")
+        elapsed = time.perf_counter() - start
+        await asyncio.gather(*saturating, return_exceptions=True)
+    assert response.status_code == 200
+    assert elapsed < 0.5
+
+
+def test_breaker_lets_one_trial_through(monkeypatch: pytest.MonkeyPatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(
+        http_client, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    breaker = CircuitBreaker(threshold=2, reset=10.0)
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert not breaker.allow()
+
+    clock.now = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.failure()
+    assert breaker.open and not breaker.allow()
+
+    clock.now = 20.0
+    assert breaker.allow()
+    breaker.success()
+    assert not breaker.open and breaker.allow()
+
+
+def test_pool_metrics_skipped_without_pool_internals():
+    transport = ResilientTransport(config.HttpClient())
+    breaker = CircuitBreaker(threshold=1, reset=1.0)
+    transport._observe(
+        "http://upstream", "200", time.perf_counter(), object(), breaker
+    )
@@ -0,0 +1,74 @@
+"""Import time of `src`, checked against a budget.
+
+Heavy dependencies (the telemetry SDK, exporters, cloud clients, alembic) are
+imported by `init()` or a script, so `import src` stays cheap for scripts and
+disabled telemetry. Which modules load is checked on every run. The import
+time depends on the machine, so it is only checked against a budget when
+`IMPORT_BUDGET_MS` is set, using the best of a few runs.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parents[1]
+RUNS = 3
+BUDGET_MS = os.environ.get("IMPORT_BUDGET_MS")
+
+# loaded by `init()` or a script, never by `import src`
+DEFERRED = (
+    "alembic",
+    "google.cloud.logging",
+    "opentelemetry.exporter",
+    "opentelemetry.propagators",
+    "opentelemetry.sdk",
+    "redis",
+    "uvicorn",
+)
+
+SCRIPT = "import src, sys; print('\\n'.join(sys.modules))"
+
+
+def _import_src() -> tuple[float, set[str]]:
+    """Total import time in ms and the modules loaded by `import src`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, _ = line.removeprefix("import time:").split("|")
+        total_us += int(self_us)
+    return total_us / 1000, set(result.stdout.split())
+
+
+@pytest.fixture(scope="module")
+def runs() -> list[tuple[float, set[str]]]:
+    return [_import_src() for _ in range(RUNS if BUDGET_MS else 1)]
+
+
+@pytest.mark.skipif(not BUDGET_MS, reason="IMPORT_BUDGET_MS is not set")
+def test_import_time_within_budget(runs: list[tuple[float, set[str]]]):
+    total_ms = min(total_ms for total_ms, _ in runs)
+    assert total_ms <= float(BUDGET_MS), f"import src took {total_ms:.1f} ms"
+
+
+@pytest.mark.parametrize("package", DEFERRED)
+def test_deferred_modules_not_imported(
+    runs: list[tuple[float, set[str]]], package: str
+):
+    _, modules = runs[0]
+    eager = sorted(
+        module
+        for module in modules
+        if module == package or module.startswith(f"{package}.")
+    )
+    assert not eager, f"imported eagerly: {', '.join(eager)}"
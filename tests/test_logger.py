@@ -0,0 +1,69 @@
+import logging
+import queue
+import threading
+
+from src.dependencies.config import LogOverflow
+from src.dependencies.logger import BoundedQueueHandler, ContextQueueListener
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord(
+        "test", logging.INFO, __file__, 0, message, None, None
+    )
+
+
+class BlockingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.entered = threading.Event()
+        self.released = threading.Event()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.entered.set()
+        self.released.wait()
+        self.messages.append(record.getMessage())
+
+
+def test_drop_oldest_keeps_unfinished_tasks_accurate():
+    records = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(records, LogOverflow.DROP_OLDEST)
+    for message in ("a", "b", "c"):
+        handler.emit(_record(message))
+
+    assert handler.dropped == 1
+    assert [records.get_nowait().msg for _ in range(2)] == ["b", "c"]
+    records.task_done()
+    records.task_done()
+    # join() would hang if the evicted record were still counted
+    assert records.unfinished_tasks == 0
+
+
+def test_drop_newest_keeps_queued_records():
+    records = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(records, LogOverflow.DROP_NEWEST)
+    handler.emit(_record("a"))
+    handler.emit(_record("b"))
+
+    assert handler.dropped == 1
+    assert records.get_nowait().msg == "a"
+
+
+def test_listener_stops_with_a_full_queue():
+    records = queue.Queue(maxsize=1)
+    target = BlockingHandler()
+    listener = ContextQueueListener(records, target)
+    listener.start()
+    handler = BoundedQueueHandler(records, LogOverflow.DROP_NEWEST)
+    # one record held by the listener, one filling the queue
+    handler.emit(_record("a"))
+    assert target.entered.wait(timeout=5)
+    handler.emit(_record("b"))
+
+    stopper = threading.Thread(target=listener.stop)
+    stopper.start()
+    target.released.set()
+    stopper.join(timeout=5)
+
+    assert not stopper.is_alive()
+    assert target.messages == ["a", "b"]
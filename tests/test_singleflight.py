@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import traceback
+from types import SimpleNamespace
+
+import pytest
+
+from src.dependencies import config
+from src.dependencies.singleflight import SingleFlightGroup
+from src.services import SampleService
+
+
+class Query:
+    """A call that counts its executions and answers the count."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        return self.calls
+
+
+async def test_concurrent_callers_share_one_call():
+    group = SingleFlightGroup()
+    query = Query()
+    tasks = [
+        asyncio.create_task(group.do("read", "a", query)) for _ in range(5)
+    ]
+    async with asyncio.timeout(1):
+        await query.started.wait()
+    query.release.set()
+    assert await asyncio.gather(*tasks) == [1] * 5
+    assert query.calls == 1
+    assert not group._flights["read"]
+
+
+async def test_keys_are_called_separately():
+    group = SingleFlightGroup()
+    query = Query()
+    query.release.set()
+    await asyncio.gather(
+        group.do("read", "a", query), group.do("read", "b", query)
+    )
+    assert query.calls == 2
+
+
+async def test_error_reaches_every_caller():
+    group = SingleFlightGroup()
+    release = asyncio.Event()
+
+    async def fail() -> int:
+        await release.wait()
+        raise RuntimeError("connection lost")
+
+    leader = asyncio.create_task(group.do("read", "a", fail))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(group.do("read", "a", fail))
+    await asyncio.sleep(0)
+    release.set()
+    with pytest.raises(RuntimeError):
+        await leader
+    with pytest.raises(RuntimeError) as raised:
+        await follower
+    # a follower's traceback starts where it re-raised, not in the leader
+    frames = [frame.name for frame in traceback.extract_tb(raised.tb)]
+    assert "fail" not in frames
+
+
+async def test_cancelled_leader_hands_over_to_a_follower():
+    group = SingleFlightGroup()
+    query = Query()
+    leader = asyncio.create_task(group.do("read", "a", query))
+    async with asyncio.timeout(1):
+        await query.started.wait()
+    follower = asyncio.create_task(group.do("read", "a", query))
+    await asyncio.sleep(0)
+    leader.cancel()
+    query.release.set()
+    async with asyncio.timeout(1):
+        # the follower runs the call again instead of waiting forever
+        assert await follower == 2
+    assert leader.cancelled()
+
+
+async def test_cancelled_follower_leaves_the_flight_running():
+    group = SingleFlightGroup()
+    query = Query()
+    leader = asyncio.create_task(group.do("read", "a", query))
+    async with asyncio.timeout(1):
+        await query.started.wait()
+    follower = asyncio.create_task(group.do("read", "a", query))
+    await asyncio.sleep(0)
+    follower.cancel()
+    query.release.set()
+    assert await leader == 1
+    assert follower.cancelled()
+
+
+async def test_forget_starts_a_fresh_flight():
+    group = SingleFlightGroup()
+    query = Query()
+    before = asyncio.create_task(group.do("read", "a", query))
+    async with asyncio.timeout(1):
+        await query.started.wait()
+    # a write committed while the first read is in flight
+    group.forget("read", "a")
+    after = asyncio.create_task(group.do("read", "a", query))
+    await asyncio.sleep(0)
+    query.release.set()
+    assert await asyncio.gather(before, after) == [2, 2]
+    assert query.calls == 2
+    assert not group._flights["read"]
+
+
+async def test_disabled_group_runs_every_call():
+    group = SingleFlightGroup(enabled=False)
+    query = Query()
+    query.release.set()
+    await asyncio.gather(*(group.do("read", "a", query) for _ in range(3)))
+    assert query.calls == 3
+
+
+@pytest.mark.parametrize("pinned", [False, True])
+async def test_pinned_reads_are_not_coalesced(pinned: bool):
+    service = SampleService(
+        config=config.get_config(),
+        sample_repository=SimpleNamespace(pinned=lambda: pinned),
+        logger=logging.getLogger("test"),
+        flight=SingleFlightGroup(),
+    )
+    query = Query()
+    tasks = [
+        asyncio.create_task(service._coalesce("read", "a", query))
+        for _ in range(3)
+    ]
+    async with asyncio.timeout(1):
+        await query.started.wait()
+    query.release.set()
+    await asyncio.gather(*tasks)
+    assert query.calls == (3 if pinned else 1)
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import pytest
+from opentelemetry import propagate, trace
+from opentelemetry.trace import NonRecordingSpan, SpanContext, TraceFlags
+
+from src.dependencies import tracer
+from src.dependencies.config import Exporter
+
+
+@pytest.fixture
+def exporter(monkeypatch: pytest.MonkeyPatch, request: pytest.FixtureRequest):
+    monkeypatch.setattr(tracer.config.observability, "exporter", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("exporter", [Exporter.NONE], indirect=True)
+async def test_none_installs_no_provider(exporter: Exporter):
+    await tracer.init()
+    try:
+        assert tracer._provider is None
+        assert tracer.get_exporter() is None
+    finally:
+        await tracer.close()
+
+
+@pytest.mark.parametrize("exporter", [Exporter.MEMORY], indirect=True)
+async def test_spans_are_exported_in_batches(exporter: Exporter):
+    await tracer.init()
+    try:
+        async with tracer.track("operation"):
+            pass
+        tracer._provider.force_flush()
+        spans = tracer.get_exporter().get_finished_spans()
+        assert [span.name for span in spans] == ["operation"]
+        assert "traceparent" in propagate.get_global_textmap().fields
+    finally:
+        await tracer.close()
+
+
+@pytest.fixture
+def started(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Names of the spans `@observe` starts."""
+    started: list[str] = []
+    real = tracer._tracer
+
+    def start_as_current_span(name, **kwargs):
+        started.append(name)
+        return real.start_as_current_span(name, **kwargs)
+
+    monkeypatch.setattr(
+        tracer,
+        "_tracer",
+        SimpleNamespace(start_as_current_span=start_as_current_span),
+    )
+    return started
+
+
+@tracer.observe()
+async def child():
+    return "child"
+
+
+@tracer.observe()
+async def parent():
+    return await child()
+
+
+async def test_children_of_unsampled_parent_start_no_spans(
+    started: list[str],
+):
+    unsampled = NonRecordingSpan(
+        SpanContext(
+            trace_id=1,
+            span_id=1,
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.DEFAULT),
+        )
+    )
+    with trace.use_span(unsampled):
+        assert await parent() == "child"
+    assert started == []
+
+
+async def test_sampled_calls_start_spans(started: list[str]):
+    assert await parent() == "child"
+    assert started == [parent.__qualname__, child.__qualname__]
+
+
+@pytest.mark.parametrize("exporter", [Exporter.MEMORY], indirect=True)
+async def test_zero_sample_rate_starts_no_root_span(
+    exporter: Exporter, monkeypatch: pytest.MonkeyPatch, started: list[str]
+):
+    monkeypatch.setattr(tracer.config.observability, "sample_rate", 0.0)
+    await tracer.init()
+    try:
+        assert await parent() == "child"
+        assert started == []
+    finally:
+        await tracer.close()